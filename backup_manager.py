@@ -5,12 +5,17 @@ Handles automatic database backups with configurable settings.
 
 import os
 import shutil
+import hashlib
 import sqlite3
+import threading
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
 import logging
 
+# Sidecar file extension holding the content digest of a backup
+DIGEST_SUFFIX = ".digest"
+
 
 class BackupManager:
     def __init__(self, db_path: str, backup_path: str, max_backups: int = 10):
@@ -26,8 +31,15 @@ class BackupManager:
         self.backup_path = Path(backup_path)
         self.max_backups = max_backups
         
+        # Long-lived source connection, reused by every backup
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        
         # Create backup directory if it doesn't exist
         self._ensure_backup_directory()
+        
+        # Put the database in WAL mode so backups don't block writers
+        self._configure_database()
     
     def _ensure_backup_directory(self):
         """Create backup directory if it doesn't exist."""
@@ -37,6 +49,69 @@ class BackupManager:
         except Exception as e:
             print(f"Warning: Could not create backup directory {self.backup_path}: {e}")
     
+    def _configure_database(self):
+        """Open the source connection and switch the database to WAL journaling."""
+        try:
+            self._get_connection()
+        except Exception as e:
+            print(f"Warning: Could not configure database journaling: {e}")
+    
+    def _get_connection(self) -> Optional[sqlite3.Connection]:
+        """
+        Get the long-lived connection to the database, opening it on first use.
+        
+        Returns:
+            The connection, or None if the database file doesn't exist yet
+        """
+        if self._conn is None:
+            if not os.path.exists(self.db_path):
+                return None
+            
+            conn = sqlite3.connect(self.db_path, timeout=5, check_same_thread=False)
+            self._apply_pragmas(conn)
+            self._conn = conn
+        
+        return self._conn
+    
+    def _apply_pragmas(self, conn: sqlite3.Connection):
+        """
+        Configure a connection for fast, backup-friendly I/O.
+        
+        synchronous=NORMAL skips the fsync on every commit in WAL mode; a power
+        loss may drop the last committed transactions but never corrupts the file.
+        """
+        # journal_mode is persistent, so readers and writers stop blocking each other
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA wal_autocheckpoint=1000")
+    
+    def _checkpoint(self) -> bool:
+        """
+        Fold the whole write-ahead log into the main file and empty it.
+        
+        Returns:
+            True unless another connection kept the checkpoint from completing
+        """
+        with self._conn_lock:
+            conn = self._get_connection()
+            if conn is None:
+                return True
+            busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+            return not busy
+    
+    def close(self):
+        """Release the database connection."""
+        self._release_connection()
+    
+    def _release_connection(self):
+        """Close the source connection; it is reopened on next use."""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
     def create_backup(self) -> Optional[str]:
         """
         Create a backup of the database.
@@ -49,16 +124,30 @@ class BackupManager:
             return None
         
         try:
+            # The digest is only comparable across runs with an empty WAL; if
+            # another connection keeps the checkpoint from finishing, back up
+            # without one
+            digest = self._hash_database() if self._checkpoint() else None
+            
+            # Skip the copy entirely if nothing changed since the last backup
+            latest_backup = self._find_unchanged_backup(digest) if digest else None
+            if latest_backup:
+                # Refresh its mtime so the retention policy still treats it as newest
+                os.utime(latest_backup)
+                print(f"ℹ️  Database unchanged, reusing backup: {latest_backup}")
+                return str(latest_backup)
+            
             # Generate backup filename with timestamp
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_filename = f"pastey_backup_{timestamp}.db"
             backup_file_path = self.backup_path / backup_filename
             
-            # Ensure database is not locked by closing any connections
-            self._ensure_db_closed()
+            # Snapshot the database with SQLite's online backup API
+            self._backup_database(backup_file_path)
             
-            # Copy the database file
-            shutil.copy2(self.db_path, backup_file_path)
+            # Remember what was backed up for the next run
+            if digest:
+                self._digest_path(backup_file_path).write_text(digest)
             
             print(f"✅ Backup created successfully: {backup_file_path}")
             
@@ -71,32 +160,101 @@ class BackupManager:
             print(f"❌ Failed to create backup: {e}")
             return None
     
-    def _ensure_db_closed(self):
-        """Ensure database connections are properly closed."""
+    def _hash_database(self) -> str:
+        """
+        Hash the database state on disk (main file plus write-ahead log).
+        
+        Returns:
+            Hex digest that changes whenever the stored data changes
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for path in (self.db_path, f"{self.db_path}-wal"):
+            if not os.path.exists(path):
+                continue
+            with open(path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _digest_path(self, backup_file: Path) -> Path:
+        """Get the sidecar digest file path for a backup file."""
+        return backup_file.with_name(backup_file.name + DIGEST_SUFFIX)
+    
+    def _find_unchanged_backup(self, digest: str) -> Optional[Path]:
+        """
+        Find the most recent backup if it matches the given database digest.
+        
+        Returns:
+            Path to the matching backup, or None if a new backup is needed
+        """
+        backups = self._scan_backups()
+        if not backups:
+            return None
+        
+        latest_backup = backups[0][1]
         try:
-            # Create a temporary connection and close it to ensure DB is accessible
-            conn = sqlite3.connect(self.db_path)
-            conn.close()
-        except Exception as e:
-            print(f"Warning: Database access check failed: {e}")
+            if self._digest_path(latest_backup).read_text().strip() == digest:
+                return latest_backup
+        except OSError:
+            pass  # No digest recorded for this backup
+        return None
+    
+    def _backup_database(self, backup_file_path: Path, pages: int = 1024):
+        """
+        Copy the database page by page using SQLite's online backup API.
+        
+        Unlike a plain file copy, this takes proper locks while reading, so
+        concurrent writers can't leave a torn backup behind.
+        
+        Args:
+            backup_file_path: Destination file for the snapshot
+            pages: Number of pages copied per step (-1 copies everything at once)
+        """
+        with self._conn_lock:
+            src = self._get_connection()
+            if src is None:
+                raise FileNotFoundError(self.db_path)
+            
+            dst = sqlite3.connect(str(backup_file_path))
+            try:
+                src.backup(dst, pages=pages)
+            finally:
+                dst.close()
+    
+    def _scan_backups(self) -> list:
+        """
+        Scan the backup directory once.
+        
+        Returns:
+            List of (mtime, path) tuples sorted by date (newest first)
+        """
+        # scandir entries carry cached stat data, so no extra syscall per file on Windows
+        with os.scandir(self.backup_path) as it:
+            entries = [(entry.stat(follow_symlinks=False).st_mtime, Path(entry.path))
+                       for entry in it
+                       if entry.name.startswith("pastey_backup_") and entry.name.endswith(".db")
+                       and entry.is_file(follow_symlinks=False)]
+        entries.sort(reverse=True)
+        return entries
     
     def _cleanup_old_backups(self):
         """Remove old backup files, keeping only the most recent ones."""
         try:
-            # Get all backup files
-            backup_files = list(self.backup_path.glob("pastey_backup_*.db"))
+            # Get all backup files (newest first)
+            backup_files = self._scan_backups()
             
             if len(backup_files) <= self.max_backups:
                 return
             
-            # Sort by modification time (newest first)
-            backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-            
             # Remove excess files
             files_to_remove = backup_files[self.max_backups:]
-            for file_path in files_to_remove:
+            for _, file_path in files_to_remove:
                 try:
                     file_path.unlink()
+                    try:
+                        self._digest_path(file_path).unlink()
+                    except FileNotFoundError:
+                        pass
                     print(f"🗑️  Removed old backup: {file_path.name}")
                 except Exception as e:
                     print(f"Warning: Could not remove old backup {file_path}: {e}")
@@ -112,13 +270,40 @@ class BackupManager:
             List of backup file paths sorted by date (newest first)
         """
         try:
-            backup_files = list(self.backup_path.glob("pastey_backup_*.db"))
-            backup_files.sort(key=lambda x: x.stat().st_mtime, reverse=True)
-            return backup_files
+            return [file_path for _, file_path in self._scan_backups()]
         except Exception as e:
             print(f"Error listing backups: {e}")
             return []
     
+    def _leave_wal(self) -> bool:
+        """
+        Switch the database out of WAL mode, which only works while no other connection is open.
+        
+        Idle connections count too, so this fails while Pastey is running.
+        On success the WAL has been folded into the main file and -wal and
+        -shm are gone.
+        
+        Returns:
+            True if this connection is the only one, False if the database is in use
+        """
+        with self._conn_lock:
+            conn = self._get_connection()
+            if conn is None:
+                return True
+            try:
+                mode = conn.execute("PRAGMA journal_mode=DELETE").fetchone()[0]
+            except sqlite3.OperationalError:
+                return False
+            return mode.lower() == "delete"
+    
+    def _lock_exclusive(self):
+        """Keep every other connection out of the database until _release_connection."""
+        with self._conn_lock:
+            conn = self._get_connection()
+            if conn is not None:
+                conn.execute("PRAGMA locking_mode=EXCLUSIVE")
+                conn.execute("BEGIN EXCLUSIVE")
+    
     def restore_backup(self, backup_file: str) -> bool:
         """
         Restore database from a backup file.
@@ -135,19 +320,46 @@ class BackupManager:
                 print(f"Backup file not found: {backup_file}")
                 return False
             
-            # Create backup of current database before restoring
-            current_backup = f"{self.db_path}.before_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-            shutil.copy2(self.db_path, current_backup)
-            print(f"Current database backed up to: {current_backup}")
+            db_exists = os.path.exists(self.db_path)
+            if db_exists:
+                if not self._leave_wal():
+                    print("❌ Failed to restore backup: the database is in use, close Pastey first")
+                    return False
+                
+                # Create backup of current database before restoring
+                current_backup = f"{self.db_path}.before_restore_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                self._backup_database(Path(current_backup), pages=-1)
+                print(f"Current database backed up to: {current_backup}")
+                
+                # The online backup can't read through an exclusive lock, so take it now
+                self._lock_exclusive()
+            
+            # Copy next to the database first, then swap it in atomically so a
+            # crash mid-copy can never leave a half-written database behind
+            temp_path = f"{self.db_path}.restore.tmp"
+            shutil.copy2(backup_path, temp_path)
+            
+            # A leftover write-ahead log would be replayed onto the restored
+            # file, so make sure none is there before the swap
+            for suffix in ("-wal", "-shm"):
+                try:
+                    os.remove(f"{self.db_path}{suffix}")
+                except FileNotFoundError:
+                    pass
+            
+            # Windows can't replace a file that is still open, so the lock is
+            # dropped only right before the swap
+            self._release_connection()
+            os.replace(temp_path, self.db_path)
             
-            # Restore from backup
-            shutil.copy2(backup_path, self.db_path)
             print(f"✅ Database restored from: {backup_file}")
             
             return True
             
         except Exception as e:
             print(f"❌ Failed to restore backup: {e}")
+            # Don't keep other connections locked out after a failed restore
+            self._release_connection()
             return False
 
 
@@ -169,7 +381,10 @@ def create_backup_if_enabled(db_path: str, backup_path: str, max_backups: int =
     
     try:
         backup_manager = BackupManager(db_path, backup_path, max_backups)
-        result = backup_manager.create_backup()
+        try:
+            result = backup_manager.create_backup()
+        finally:
+            backup_manager.close()
         return result is not None
     except Exception as e:
         print(f"❌ Backup process failed: {e}")
@@ -9,6 +9,8 @@ import webbrowser
 from typing import Callable, List, Tuple, Optional
 from database import BookmarksDB
 
+BOOKMARK_COLUMNS = ("title", "description", "url", "category")
+
 
 class BookmarkDialog:
     """Dialog for adding/editing bookmarks."""
@@ -174,8 +176,7 @@ class BookmarksGUI:
         tree_frame.pack(fill=tk.BOTH, expand=True)
         
         # Create treeview
-        columns = ("title", "description", "url", "category")
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
+        self.tree = ttk.Treeview(tree_frame, columns=BOOKMARK_COLUMNS, show="headings", height=15)
         
         # Configure columns
         self.tree.heading("title", text="Title")
@@ -242,45 +243,41 @@ class BookmarksGUI:
         if not self.tree:
             return
         
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+        # Clear existing items in a single call
+        self.tree.delete(*self.tree.get_children())
+        
+        # Get bookmarks and categories from database in one round-trip
+        category = None if self.current_category == "All" else self.current_category
+        bookmarks, categories = self.db.get_bookmarks_and_categories(category)
         
         # Update category filter
-        categories = ["All"] + self.db.get_categories()
+        categories = ["All"] + categories
         self.category_filter['values'] = categories
         
         if self.current_category not in categories:
+            # Selected category no longer exists, fall back to all bookmarks
             self.current_category = "All"
+            bookmarks, _ = self.db.get_bookmarks_and_categories()
         
         self.category_filter.set(self.current_category)
         
-        # Get bookmarks from database
-        if self.current_category == "All":
-            bookmarks = self.db.get_all_bookmarks()
-        else:
-            bookmarks = self.db.get_bookmarks_by_category(self.current_category)
-        
-        # Add bookmarks to treeview
+        insert = self.tree.insert
         for bookmark_id, title, description, url, category, timestamp in bookmarks:
             # Truncate long text for display
-            display_title = title[:30] + "..." if len(title) > 30 else title
-            display_desc = description.replace('\n', ' ')[:50] + "..." if len(description) > 50 else description.replace('\n', ' ')
-            display_url = url[:60] + "..." if len(url) > 60 else url
+            display_title = f"{title[:30]}..." if len(title) > 30 else title
+            display_desc = description.replace('\n', ' ')
+            if len(display_desc) > 50:
+                display_desc = f"{display_desc[:50]}..."
+            display_url = f"{url[:60]}..." if len(url) > 60 else url
             
-            self.tree.insert("", tk.END, 
-                           values=(display_title, display_desc, display_url, category),
-                           tags=(str(bookmark_id),))
+            insert("", tk.END, iid=bookmark_id,
+                   values=(display_title, display_desc, display_url, category))
     
     def get_selected_bookmark_id(self) -> Optional[int]:
         """Get the ID of the currently selected bookmark."""
+        # Items are inserted with the bookmark ID as their iid
         selection = self.tree.selection()
-        if not selection:
-            return None
-        
-        item = selection[0]
-        tags = self.tree.item(item, "tags")
-        return int(tags[0]) if tags else None
+        return int(selection[0]) if selection else None
     
     def add_bookmark(self):
         """Add a new bookmark."""
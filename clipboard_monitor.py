@@ -7,20 +7,39 @@ import pyperclip
 import threading
 import time
 from typing import Callable, Optional
+from win32_utils import IS_WINDOWS, ClipboardListener, set_clipboard_text
+
+# Polling interval bounds (seconds) used when native notifications aren't available
+MIN_POLL_INTERVAL = 0.05
+MAX_POLL_INTERVAL = 0.5
 
 
 class ClipboardMonitor:
-    def __init__(self, callback: Callable[[str], None]):
+    def __init__(self, callback: Callable[[str], None],
+                 on_polling: Optional[Callable[[], None]] = None):
         """
         Initialize clipboard monitor.
         
         Args:
             callback: Function to call when new clipboard content is detected
+            on_polling: Function to call on the monitor thread once monitoring
+                        falls back to polling, e.g. to start adjusting the interval
         """
         self.callback = callback
+        self.on_polling = on_polling
         self.monitoring = False
         self.monitor_thread: Optional[threading.Thread] = None
+        self.listener: Optional[ClipboardListener] = None
+        # True once monitoring has fallen back to polling
+        self.polling = False
         self.last_content = ""
+        self._last_len = 0
+        # Guards the two fields above, written by both the monitor and set_content
+        self._content_lock = threading.Lock()
+        # Longest the poll loop may sleep while the clipboard is idle
+        self._max_interval = MAX_POLL_INTERVAL
+        # Set to cut a poll sleep short (interval lowered or monitoring stopped)
+        self._wake = threading.Event()
         
     def start_monitoring(self):
         """Start monitoring clipboard in a separate thread."""
@@ -35,38 +54,114 @@ class ClipboardMonitor:
     def stop_monitoring(self):
         """Stop monitoring clipboard."""
         self.monitoring = False
+        self._wake.set()
+        if self.listener:
+            self.listener.stop()
         if self.monitor_thread and self.monitor_thread.is_alive():
             self.monitor_thread.join(timeout=1)
         print("Clipboard monitoring stopped.")
     
+    def set_interval(self, interval: float):
+        """
+        Set the longest time the poll loop may wait between clipboard checks.
+        
+        Only affects polling; native clipboard notifications need no interval.
+        
+        Args:
+            interval: Maximum polling interval in seconds, at least MIN_POLL_INTERVAL
+        """
+        interval = max(interval, MIN_POLL_INTERVAL)
+        lowered = interval < self._max_interval
+        self._max_interval = interval
+        if lowered:
+            # Don't finish a long idle sleep at the old rate
+            self._wake.set()
+    
     def _monitor_loop(self):
         """Main monitoring loop that runs in a separate thread."""
         # Initialize with current clipboard content
         try:
-            self.last_content = pyperclip.paste()
+            initial_content = pyperclip.paste()
         except Exception:
-            self.last_content = ""
+            initial_content = ""
+        with self._content_lock:
+            self._remember(initial_content)
+        
+        if IS_WINDOWS:
+            # Let Windows notify us of clipboard changes instead of polling
+            try:
+                self.listener = ClipboardListener(self._check_clipboard)
+                if self.monitoring:
+                    self.listener.run()
+                return
+            except Exception as e:
+                print(f"Clipboard listener unavailable, falling back to polling: {e}")
+            finally:
+                self.listener = None
+        
+        self._poll_loop()
+    
+    def _poll_loop(self):
+        """Poll the clipboard for changes when native notifications aren't available."""
+        self.polling = True
+        if self.on_polling:
+            self.on_polling()
+        idle_sleep = MIN_POLL_INTERVAL
         
         while self.monitoring:
             try:
-                current_content = pyperclip.paste()
-                
-                # Check if content has changed and is not empty
-                if (current_content != self.last_content and 
-                    current_content.strip() and 
-                    isinstance(current_content, str)):
-                    
-                    self.last_content = current_content
-                    # Call the callback with new content
-                    self.callback(current_content)
+                if self._check_clipboard():
+                    # Stay responsive right after a copy, the user is likely active
+                    idle_sleep = MIN_POLL_INTERVAL
+                else:
+                    # Back off while the clipboard is idle
+                    idle_sleep = idle_sleep * 1.5
+                idle_sleep = min(idle_sleep, self._max_interval)
                 
                 # Sleep to avoid excessive CPU usage
-                time.sleep(0.5)
+                if self._wake.wait(idle_sleep):
+                    self._wake.clear()
                 
             except Exception as e:
                 print(f"Error monitoring clipboard: {e}")
                 time.sleep(1)  # Wait longer on error
     
+    def _check_clipboard(self) -> bool:
+        """
+        Read the clipboard and invoke the callback if its content changed.
+        
+        Returns:
+            True if new content was found, False otherwise
+        """
+        current_content = pyperclip.paste()
+        
+        # Cheapest checks first: type, then length, then content
+        if not isinstance(current_content, str):
+            return False
+        with self._content_lock:
+            if not self._is_new_content(current_content):
+                return False
+            self._remember(current_content)
+        
+        # Ignore empty content; isspace() scans without allocating a stripped copy
+        if not current_content or current_content.isspace():
+            return False
+        
+        # Call the callback with new content
+        self.callback(current_content)
+        return True
+    
+    def _is_new_content(self, content: str) -> bool:
+        """Check whether content differs from the last seen clipboard content."""
+        # Different length means different content without touching the data;
+        # otherwise the comparison stops at the first differing character
+        return len(content) != self._last_len or content != self.last_content
+    
+    def _remember(self, content: str):
+        """Record content as the last seen clipboard content. Call with _content_lock held."""
+        self.last_content = content
+        self._last_len = len(content)
+    
     def get_current_content(self) -> str:
         """Get current clipboard content."""
         try:
@@ -76,8 +171,19 @@ class ClipboardMonitor:
     
     def set_content(self, content: str):
         """Set clipboard content."""
+        # Remember it before writing: the clipboard update notification can
+        # reach the monitor thread before the write call even returns, and
+        # the pasted text mustn't come back as a new history entry
+        with self._content_lock:
+            previous = (self.last_content, self._last_len)
+            self._remember(content)
         try:
-            pyperclip.copy(content)
-            self.last_content = content
+            # The direct Win32 call skips pyperclip's throwaway window per copy
+            if not (IS_WINDOWS and set_clipboard_text(content)):
+                pyperclip.copy(content)
         except Exception as e:
             print(f"Error setting clipboard content: {e}")
+            with self._content_lock:
+                # Unless the monitor has seen something newer meanwhile
+                if self.last_content is content:
+                    self.last_content, self._last_len = previous
@@ -5,206 +5,750 @@ Handles SQLite operations for storing clipboard history.
 
 import sqlite3
 import os
-from datetime import datetime
-from typing import List, Tuple, Optional
+import threading
+import functools
+import hashlib
+import queue
+import time
+from typing import Iterable, List, Tuple, Optional
+
+DEFAULT_SENSITIVE_ALIAS = "*** Sensitive Data ***"
+
+# Oldest SQLite with RETURNING and ALTER TABLE ... DROP COLUMN, both used below
+MIN_SQLITE_VERSION = (3, 35, 0)
+
+# Background writer: how many queued items to insert per transaction, how long
+# a batch stays open for more after its first item, and how many may be pending
+WRITE_BATCH_SIZE = 64
+WRITE_BATCH_WAIT = 0.05
+WRITE_QUEUE_SIZE = 1000
+
+_WRITER_STOP = object()
+
+# Local time with millisecond precision, computed by SQLite. CURRENT_TIMESTAMP
+# would be UTC with whole seconds, breaking ordering against existing rows
+_SQL_NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+# SQL statements are module-level constants so every call reuses the exact same
+# text, which is what the per-connection sqlite3 statement cache is keyed on
+
+# Each distinct text is stored once in clipboard_contents, unique by its digest;
+# clipboard_items rows point at it through content_hash
+_SQL_INSERT_CONTENT = """
+    INSERT OR IGNORE INTO clipboard_contents (hash, content)
+    VALUES (?, ?)
+"""
+
+_SQL_INSERT_ITEM = f"""
+    INSERT INTO clipboard_items (content_hash, is_pinned, timestamp)
+    SELECT ?, 0, {_SQL_NOW}
+    WHERE NOT EXISTS (
+        SELECT 1 FROM clipboard_items 
+        WHERE id = (SELECT MAX(id) FROM clipboard_items) AND content_hash = ?
+    )
+"""
+
+# The row add_item compares against when skipping consecutive duplicates
+_SQL_NEWEST_HASH = """
+    SELECT content_hash FROM clipboard_items 
+    WHERE id = (SELECT MAX(id) FROM clipboard_items)
+"""
+
+_SQL_SELECT_ALL_ITEMS = """
+    SELECT i.id, c.content, i.is_pinned, i.is_sensitive, i.alias, i.timestamp 
+    FROM clipboard_items i JOIN clipboard_contents c ON c.hash = i.content_hash 
+    ORDER BY i.is_pinned DESC, i.timestamp DESC, i.id DESC
+"""
+
+# What the history list shows: the alias of sensitive items, otherwise the content
+# on one line, cut to DISPLAY_LENGTH + 1 characters so the caller can tell when
+# to add an ellipsis, and the timestamp without milliseconds. Large clipboard
+# texts never leave SQLite this way
+DISPLAY_LENGTH = 80
+
+_DISPLAY_COLUMNS = f"""
+    i.id,
+    CASE WHEN i.is_sensitive AND i.alias <> '' THEN i.alias
+         ELSE substr(replace(replace(c.content, char(10), ' '), char(13), ''), 1, {DISPLAY_LENGTH + 1})
+    END,
+    i.is_pinned, i.is_sensitive, substr(i.timestamp, 1, 19), i.timestamp
+"""
+
+_SQL_SELECT_DISPLAY_PAGE = f"""
+    SELECT {_DISPLAY_COLUMNS}
+    FROM clipboard_items i JOIN clipboard_contents c ON c.hash = i.content_hash 
+    ORDER BY i.is_pinned DESC, i.timestamp DESC, i.id DESC
+    LIMIT ?
+"""
+
+# Keyset page: the rows that sort after a given (is_pinned, timestamp, id) key.
+# Unlike OFFSET, SQLite doesn't have to step over every earlier row
+_SQL_SELECT_DISPLAY_PAGE_AFTER = f"""
+    SELECT {_DISPLAY_COLUMNS}
+    FROM clipboard_items i JOIN clipboard_contents c ON c.hash = i.content_hash 
+    WHERE (i.is_pinned, i.timestamp, i.id) < (?, ?, ?)
+    ORDER BY i.is_pinned DESC, i.timestamp DESC, i.id DESC
+    LIMIT ?
+"""
+
+# Full-text search runs against clipboard_fts, which indexes clipboard_contents
+# so each distinct text is indexed once. Sensitive items are left out so a
+# search can't reveal what their alias hides
+_SQL_SEARCH_CONDITION = """
+    c.id IN (SELECT rowid FROM clipboard_fts WHERE clipboard_fts MATCH ?)
+    AND NOT i.is_sensitive
+"""
+
+_SQL_SEARCH_DISPLAY_PAGE = f"""
+    SELECT {_DISPLAY_COLUMNS}
+    FROM clipboard_items i JOIN clipboard_contents c ON c.hash = i.content_hash 
+    WHERE {_SQL_SEARCH_CONDITION}
+    ORDER BY i.is_pinned DESC, i.timestamp DESC, i.id DESC
+    LIMIT ?
+"""
+
+_SQL_SEARCH_DISPLAY_PAGE_AFTER = f"""
+    SELECT {_DISPLAY_COLUMNS}
+    FROM clipboard_items i JOIN clipboard_contents c ON c.hash = i.content_hash 
+    WHERE {_SQL_SEARCH_CONDITION} AND (i.is_pinned, i.timestamp, i.id) < (?, ?, ?)
+    ORDER BY i.is_pinned DESC, i.timestamp DESC, i.id DESC
+    LIMIT ?
+"""
+
+_SQL_SELECT_DISPLAY_ITEM = f"""
+    SELECT {_DISPLAY_COLUMNS}
+    FROM clipboard_items i JOIN clipboard_contents c ON c.hash = i.content_hash 
+    WHERE i.id = ?
+"""
+
+_SQL_SELECT_ITEM = """
+    SELECT i.id, c.content, i.is_pinned, i.is_sensitive, i.alias, i.timestamp 
+    FROM clipboard_items i JOIN clipboard_contents c ON c.hash = i.content_hash 
+    WHERE i.id = ?
+"""
+
+_SQL_TOGGLE_PIN = """
+    UPDATE clipboard_items 
+    SET is_pinned = NOT is_pinned 
+    WHERE id = ?
+    RETURNING is_pinned
+"""
+
+_SQL_TOGGLE_SENSITIVE = """
+    UPDATE clipboard_items 
+    SET is_sensitive = NOT is_sensitive,
+        alias = CASE WHEN is_sensitive THEN NULL ELSE ? END
+    WHERE id = ?
+    RETURNING is_sensitive
+"""
+
+_SQL_UPDATE_ALIAS = """
+    UPDATE clipboard_items 
+    SET alias = ?
+    WHERE id = ? AND is_sensitive = 1
+"""
+
+# Deletes return the removed rows' content hashes for the orphaned-content sweep
+_SQL_DELETE_ITEM = """
+    DELETE FROM clipboard_items 
+    WHERE id = ?
+    RETURNING content_hash
+"""
+
+_SQL_CLEAR_UNPINNED = """
+    DELETE FROM clipboard_items 
+    WHERE is_pinned = 0
+    RETURNING content_hash
+"""
+
+# Pinned items are never removed; unpinned ones beyond the newest N are
+_SQL_CLEANUP_UNPINNED = """
+    DELETE FROM clipboard_items 
+    WHERE is_pinned = 0 AND id NOT IN (
+        SELECT id FROM clipboard_items 
+        WHERE is_pinned = 0
+        ORDER BY timestamp DESC, id DESC
+        LIMIT ?
+    )
+    RETURNING content_hash
+"""
+
+# Run for each deleted item's hash so texts no longer referenced don't linger.
+# Both lookups are indexed, so the cost doesn't grow with the history
+_SQL_DELETE_ORPHAN_CONTENT = """
+    DELETE FROM clipboard_contents 
+    WHERE hash = ? AND NOT EXISTS (
+        SELECT 1 FROM clipboard_items 
+        WHERE content_hash = ?
+    )
+"""
+
+_SQL_ITEM_CONTENT = """
+    SELECT c.content 
+    FROM clipboard_items i JOIN clipboard_contents c ON c.hash = i.content_hash 
+    WHERE i.id = ?
+"""
+
+_SQL_INSERT_BOOKMARK = f"""
+    INSERT INTO bookmarks (title, description, url, category, timestamp)
+    VALUES (?, ?, ?, ?, {_SQL_NOW})
+"""
+
+_SQL_SELECT_ALL_BOOKMARKS = """
+    SELECT id, title, description, url, category, timestamp 
+    FROM bookmarks 
+    ORDER BY category, title
+"""
+
+_SQL_SELECT_BOOKMARKS_BY_CATEGORY = """
+    SELECT id, title, description, url, category, timestamp 
+    FROM bookmarks 
+    WHERE category = ?
+    ORDER BY title
+"""
+
+_SQL_SELECT_CATEGORIES = """
+    SELECT DISTINCT category 
+    FROM bookmarks 
+    ORDER BY category
+"""
+
+_SQL_UPDATE_BOOKMARK = """
+    UPDATE bookmarks 
+    SET title = ?, description = ?, url = ?, category = ?
+    WHERE id = ?
+"""
+
+_SQL_DELETE_BOOKMARK = """
+    DELETE FROM bookmarks 
+    WHERE id = ?
+"""
+
+_SQL_SELECT_BOOKMARK = """
+    SELECT id, title, description, url, category, timestamp 
+    FROM bookmarks 
+    WHERE id = ?
+"""
+
+
+def _content_hash(content: str) -> bytes:
+    """Short digest used to compare clipboard content without keeping a copy."""
+    return hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+def _fts_query(text: str) -> str:
+    """
+    Turn search box text into an FTS5 query.
+    
+    Every word becomes a quoted prefix term, so results narrow while typing and
+    characters that mean something to FTS5 are matched literally.
+    """
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in text.split())
+
+
+def sqlite_has_fts5() -> bool:
+    """Check whether this Python's SQLite was built with FTS5, which history search needs."""
+    conn = sqlite3.connect(":memory:")
+    try:
+        conn.execute("CREATE VIRTUAL TABLE fts5_probe USING fts5(content)")
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.close()
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """Open a connection tuned for many small commits, shareable across threads."""
+    conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=256)
+    # These settings are per-connection; journal_mode=WAL is set once at schema init
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-64000")
+    # Serve large reads straight from the mapped file instead of read() calls
+    conn.execute("PRAGMA mmap_size=268435456")
+    # Writes are small and infrequent; checkpoint well before the default
+    # 1000 pages so readers don't have to search a long WAL
+    conn.execute("PRAGMA wal_autocheckpoint=200")
+    return conn
+
+
+def _backup_before_migration(conn: sqlite3.Connection):
+    """
+    Copy the database to <db>.pre_migration before the content_hash migration.
+    
+    That migration drops clipboard_items.content, so older builds can't open the
+    result. An existing copy is kept: it's the one taken before the first attempt.
+    """
+    db_file = conn.execute("PRAGMA database_list").fetchone()[2]
+    if not db_file:
+        return  # In-memory database, nothing to lose
+    
+    backup_file = f"{db_file}.pre_migration"
+    if os.path.exists(backup_file):
+        return
+    
+    dst = sqlite3.connect(backup_file)
+    try:
+        conn.backup(dst)
+    finally:
+        dst.close()
+    print(f"Database backed up before migration to: {backup_file}")
+
+
+def _ensure_schema(conn: sqlite3.Connection):
+    """Create and migrate the clipboard and bookmarks tables."""
+    with conn:
+        cursor = conn.cursor()
+        
+        # WAL is persistent on the database file, so every later connection uses it.
+        # It can't be changed inside a transaction, so do it first
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
+        # An existing history without content_hash is about to be migrated in place
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(clipboard_items)")}
+        if columns and "content_hash" not in columns:
+            _backup_before_migration(conn)
+        
+        # Create and migrate the whole schema in a single transaction
+        cursor.execute("BEGIN")
+        # id gives the full-text index a stable key; implicit rowids may change on VACUUM
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS clipboard_contents (
+                id INTEGER PRIMARY KEY,
+                hash BLOB NOT NULL UNIQUE,
+                content TEXT NOT NULL
+            )
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS clipboard_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                content_hash BLOB NOT NULL REFERENCES clipboard_contents (hash),
+                is_pinned BOOLEAN DEFAULT 0,
+                is_sensitive BOOLEAN DEFAULT 0,
+                alias TEXT DEFAULT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Add new columns to existing database if they don't exist.
+        # Probing first keeps startup read-only once the schema is current
+        columns = {row[1] for row in cursor.execute("PRAGMA table_info(clipboard_items)")}
+        if "is_sensitive" not in columns:
+            cursor.execute("ALTER TABLE clipboard_items ADD COLUMN is_sensitive BOOLEAN DEFAULT 0")
+        if "alias" not in columns:
+            cursor.execute("ALTER TABLE clipboard_items ADD COLUMN alias TEXT DEFAULT NULL")
+        if "content_hash" not in columns:
+            # Older databases keep the text inline; move it into clipboard_contents
+            cursor.execute("ALTER TABLE clipboard_items ADD COLUMN content_hash BLOB")
+            rows = [(item_id, _content_hash(content), content)
+                    for item_id, content in cursor.execute("SELECT id, content FROM clipboard_items")]
+            cursor.executemany(_SQL_INSERT_CONTENT, ((digest, content) for _, digest, content in rows))
+            cursor.executemany("UPDATE clipboard_items SET content_hash = ? WHERE id = ?",
+                               ((digest, item_id) for item_id, digest, _ in rows))
+            cursor.execute("ALTER TABLE clipboard_items DROP COLUMN content")
+        
+        # Serve the pinned-first history listing and cleanup from an index
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_clip_pinned_ts 
+            ON clipboard_items (is_pinned DESC, timestamp DESC)
+        """)
+        
+        # Lets the orphaned-content sweep check references without a table scan
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_clip_content_hash 
+            ON clipboard_items (content_hash)
+        """)
+        
+        # Full-text index over clipboard_contents, kept in sync by triggers.
+        # Contents are only ever inserted or deleted, never updated
+        has_fts = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clipboard_fts'"
+        ).fetchone()
+        if not has_fts:
+            cursor.execute("""
+                CREATE VIRTUAL TABLE clipboard_fts 
+                USING fts5(content, content='clipboard_contents', content_rowid='id')
+            """)
+            # Index whatever history the database already holds
+            cursor.execute("INSERT INTO clipboard_fts (clipboard_fts) VALUES ('rebuild')")
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS clipboard_contents_fts_insert 
+            AFTER INSERT ON clipboard_contents BEGIN
+                INSERT INTO clipboard_fts (rowid, content) VALUES (new.id, new.content);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS clipboard_contents_fts_delete 
+            AFTER DELETE ON clipboard_contents BEGIN
+                INSERT INTO clipboard_fts (clipboard_fts, rowid, content) 
+                VALUES ('delete', old.id, old.content);
+            END
+        """)
+        
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS bookmarks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title TEXT NOT NULL,
+                description TEXT NOT NULL,
+                url TEXT NOT NULL,
+                category TEXT NOT NULL,
+                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Covers ordering by category/title, category filtering and DISTINCT category
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_bm_cat_title 
+            ON bookmarks (category, title)
+        """)
+
+
+# ClipboardDB and BookmarksDB on the same file share one connection and lock.
+# Keyed by real path; each entry is [connection, lock, open instance count]
+_shared_connections = {}
+_shared_connections_lock = threading.Lock()
+
+
+def _get_conn(db_path: str) -> Tuple[sqlite3.Connection, threading.RLock]:
+    """
+    Get the shared connection for a database file, opening it on first use.
+    
+    Args:
+        db_path: Path to the SQLite database file
+        
+    Returns:
+        The connection and the lock that serializes its use across threads
+    """
+    key = os.path.realpath(db_path)
+    with _shared_connections_lock:
+        entry = _shared_connections.get(key)
+        if entry is None:
+            conn = _connect(key)
+            _ensure_schema(conn)
+            # sqlite3 connections aren't safe to use from several threads at once
+            entry = _shared_connections[key] = [conn, threading.RLock(), 0]
+        entry[2] += 1
+        return entry[0], entry[1]
+
+
+def _release_conn(conn: sqlite3.Connection):
+    """Drop one reference to a shared connection, closing it after the last one."""
+    with _shared_connections_lock:
+        for key, entry in _shared_connections.items():
+            if entry[0] is conn:
+                entry[2] -= 1
+                if entry[2] == 0:
+                    del _shared_connections[key]
+                    with entry[1]:
+                        # Leave an empty WAL file behind rather than a stale one
+                        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                        conn.close()
+                return
 
 
 class ClipboardDB:
     def __init__(self, db_path: str = "clipboard_history.db"):
         """Initialize database connection and create tables if they don't exist."""
         self.db_path = db_path
-        self.init_database()
+        # Shared with any other ClipboardDB/BookmarksDB open on the same file
+        self._conn, self._lock = _get_conn(db_path)
+        # Per-instance cache for point lookups the GUI re-issues on paste/preview
+        self._get_item_content_cached = functools.lru_cache(maxsize=256)(self._fetch_item_content)
+        # Digest of the newest item's content, or None when unknown
+        self._last_hash = None
+        self._prime_last_hash()
+        
+        # Bumped on every change to clipboard_items, so callers can tell when
+        # a listing they fetched earlier is still current
+        self.version = 0
+        
+        # Single writer thread so clipboard callbacks never wait on SQLite
+        self._write_queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+    
+    def close(self):
+        """Flush pending writes and release the database connection."""
+        if self._writer is not None:
+            self._write_queue.put(_WRITER_STOP)
+            self._writer.join()
+            self._writer = None
+        
+        if self._conn is not None:
+            _release_conn(self._conn)
+            self._conn = None
     
     def init_database(self):
-        """Create the clipboard_items table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS clipboard_items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    content TEXT NOT NULL,
-                    is_pinned BOOLEAN DEFAULT 0,
-                    is_sensitive BOOLEAN DEFAULT 0,
-                    alias TEXT DEFAULT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            
-            # Add new columns to existing database if they don't exist
-            try:
-                cursor.execute("ALTER TABLE clipboard_items ADD COLUMN is_sensitive BOOLEAN DEFAULT 0")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
-            
-            try:
-                cursor.execute("ALTER TABLE clipboard_items ADD COLUMN alias TEXT DEFAULT NULL")
-            except sqlite3.OperationalError:
-                pass  # Column already exists
-            
-            conn.commit()
+        """Create the database tables if they don't exist."""
+        with self._lock:
+            _ensure_schema(self._conn)
+    
+    def _prime_last_hash(self):
+        """Load the digest of the newest item so add_item can skip repeats."""
+        with self._lock:
+            row = self._conn.execute(_SQL_NEWEST_HASH).fetchone()
+            self._last_hash = row[0] if row else None
     
     def add_item(self, content: str) -> bool:
         """
         Add a new clipboard item to the database.
         Returns True if item was added, False if it's a duplicate of the last item.
         """
-        # Check if this is the same as the last item (avoid duplicates)
-        if self.is_duplicate(content):
+        content_hash = _content_hash(content)
+        with self._lock:
+            # Same content as the newest item: nothing to do, no query needed
+            if content_hash == self._last_hash:
+                return False
+            
+            with self._conn as conn:
+                cursor = conn.cursor()
+                cursor.execute(_SQL_INSERT_CONTENT, (content_hash, content))
+                # Skip the insert in the same statement if it duplicates the newest item
+                cursor.execute(_SQL_INSERT_ITEM, (content_hash, content_hash))
+            
+            # Either way, the newest item now holds this content
+            self._last_hash = content_hash
+            if cursor.rowcount == 1:
+                self.version += 1
+                return True
             return False
+    
+    def add_item_async(self, content: str) -> bool:
+        """
+        Queue a clipboard item to be added by the background writer.
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO clipboard_items (content, is_pinned, timestamp)
-                VALUES (?, 0, ?)
-            """, (content, datetime.now()))
-            conn.commit()
+        Args:
+            content: Clipboard text to store
+            
+        Returns:
+            True if the item was queued, False if it repeats the newest item
+            or the queue is full
+        """
+        if _content_hash(content) == self._last_hash:
+            return False
         
-        return True
+        try:
+            self._write_queue.put_nowait(content)
+            return True
+        except queue.Full:
+            print("⚠️  Clipboard write queue is full, dropping item")
+            return False
     
-    def is_duplicate(self, content: str) -> bool:
-        """Check if the content is the same as the most recent item."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT content FROM clipboard_items 
-                ORDER BY timestamp DESC 
-                LIMIT 1
-            """)
-            result = cursor.fetchone()
-            return result and result[0] == content
+    def _writer_loop(self):
+        """Insert queued items in batches, one transaction per batch."""
+        stopping = False
+        while not stopping:
+            content = self._write_queue.get()
+            if content is _WRITER_STOP:
+                break
+            
+            # Gather whatever else arrives shortly after into the same transaction.
+            # The deadline is fixed, so a steady stream can't hold the batch open
+            batch = [content]
+            deadline = time.monotonic() + WRITE_BATCH_WAIT
+            try:
+                while len(batch) < WRITE_BATCH_SIZE:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    content = self._write_queue.get(timeout=remaining)
+                    if content is _WRITER_STOP:
+                        stopping = True
+                        break
+                    batch.append(content)
+            except queue.Empty:
+                pass
+            
+            try:
+                self.bulk_add_items(batch)
+            except Exception as e:
+                print(f"Error saving clipboard items: {e}")
+    
+    def bulk_add_items(self, contents: Iterable[str]) -> int:
+        """
+        Add several clipboard items in a single transaction.
+        Consecutive duplicates are skipped, as in add_item.
+        Returns the number of items added.
+        """
+        hashed = [(_content_hash(content), content) for content in contents]
+        with self._lock, self._conn as conn:
+            conn.executemany(_SQL_INSERT_CONTENT, hashed)
+            cursor = conn.executemany(_SQL_INSERT_ITEM, ((digest, digest) for digest, _ in hashed))
+            if hashed:
+                # Inserted or skipped as a duplicate, the newest item holds the last text
+                self._last_hash = hashed[-1][0]
+            if cursor.rowcount:
+                self.version += 1
+            return cursor.rowcount
     
     def get_all_items(self) -> List[Tuple[int, str, bool, bool, str, str]]:
         """Get all clipboard items, with pinned items first."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock:
+            return self._conn.execute(_SQL_SELECT_ALL_ITEMS).fetchall()
+    
+    def get_items_for_display(self, limit: int) -> List[Tuple[int, str, bool, bool, str, str]]:
+        """
+        Get the first page of items as the history list shows them, in get_all_items order.
+        
+        Args:
+            limit: Maximum number of items to return
+            
+        Returns:
+            (id, display_text, is_pinned, is_sensitive, display_time, timestamp) rows.
+            display_text is the alias of a sensitive item, otherwise the content
+            on one line and at most DISPLAY_LENGTH + 1 characters long
+        """
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, content, is_pinned, is_sensitive, alias, timestamp 
-                FROM clipboard_items 
-                ORDER BY is_pinned DESC, timestamp DESC
-            """)
+            cursor.execute(_SQL_SELECT_DISPLAY_PAGE, (limit,))
             return cursor.fetchall()
     
-    def toggle_pin(self, item_id: int) -> bool:
-        """Toggle the pinned status of an item."""
-        with sqlite3.connect(self.db_path) as conn:
+    def get_items_for_display_after(self, key: Tuple[bool, str, int], limit: int) -> List[Tuple[int, str, bool, bool, str, str]]:
+        """
+        Get the page of display rows that follows a given row.
+        
+        Args:
+            key: (is_pinned, timestamp, id) of the last row already loaded
+            limit: Maximum number of items to return
+            
+        Returns:
+            Rows shaped like get_items_for_display, continuing its order
+        """
+        is_pinned, timestamp, item_id = key
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE clipboard_items 
-                SET is_pinned = NOT is_pinned 
-                WHERE id = ?
-            """, (item_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            cursor.execute(_SQL_SELECT_DISPLAY_PAGE_AFTER, (int(is_pinned), timestamp, item_id, limit))
+            return cursor.fetchall()
     
-    def toggle_sensitive(self, item_id: int, alias: str = None) -> bool:
-        """Toggle the sensitive status of an item and set alias if provided."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            
-            # First get current sensitive status
-            cursor.execute("SELECT is_sensitive FROM clipboard_items WHERE id = ?", (item_id,))
-            result = cursor.fetchone()
-            if not result:
-                return False
-                
-            current_sensitive = result[0]
-            new_sensitive = not current_sensitive
+    def search_items_for_display(self, text: str, limit: int,
+                                 after: Optional[Tuple[bool, str, int]] = None) -> List[Tuple[int, str, bool, bool, str, str]]:
+        """
+        Get one page of display rows whose content matches a search.
+        
+        Args:
+            text: Search box text; every word must match the start of a word
+                  in the content
+            limit: Maximum number of items to return
+            after: (is_pinned, timestamp, id) of the last row already loaded,
+                   or None for the first page
             
-            if new_sensitive and alias:
-                # Setting as sensitive with alias
-                cursor.execute("""
-                    UPDATE clipboard_items 
-                    SET is_sensitive = 1, alias = ?
-                    WHERE id = ?
-                """, (alias, item_id))
-            elif new_sensitive:
-                # Setting as sensitive without alias (use default)
-                cursor.execute("""
-                    UPDATE clipboard_items 
-                    SET is_sensitive = 1, alias = '*** Sensitive Data ***'
-                    WHERE id = ?
-                """, (item_id,))
+        Returns:
+            Rows shaped like get_items_for_display, in the same order.
+            Sensitive items are never returned
+        """
+        query = _fts_query(text)
+        if not query:
+            return []
+        with self._lock, self._conn as conn:
+            cursor = conn.cursor()
+            if after is None:
+                cursor.execute(_SQL_SEARCH_DISPLAY_PAGE, (query, limit))
             else:
-                # Removing sensitive status
-                cursor.execute("""
-                    UPDATE clipboard_items 
-                    SET is_sensitive = 0, alias = NULL
-                    WHERE id = ?
-                """, (item_id,))
-            
-            conn.commit()
-            return cursor.rowcount > 0
+                is_pinned, timestamp, item_id = after
+                cursor.execute(_SQL_SEARCH_DISPLAY_PAGE_AFTER,
+                               (query, int(is_pinned), timestamp, item_id, limit))
+            return cursor.fetchall()
+    
+    def get_item_for_display(self, item_id: int) -> Optional[Tuple[int, str, bool, bool, str, str]]:
+        """Get a single item in the same shape as get_items_for_display rows."""
+        with self._lock, self._conn as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_DISPLAY_ITEM, (item_id,))
+            return cursor.fetchone()
+    
+    def get_item(self, item_id: int) -> Optional[Tuple[int, str, bool, bool, str, str]]:
+        """Get a single clipboard item, in the same shape as get_all_items rows."""
+        with self._lock, self._conn as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_SELECT_ITEM, (item_id,))
+            return cursor.fetchone()
+    
+    def toggle_pin(self, item_id: int) -> Optional[bool]:
+        """
+        Toggle the pinned status of an item.
+        Returns the new pinned status, or None if the item doesn't exist.
+        """
+        with self._lock, self._conn as conn:
+            rows = conn.execute(_SQL_TOGGLE_PIN, (item_id,)).fetchall()
+            self.version += 1
+            return bool(rows[0][0]) if rows else None
+    
+    def toggle_sensitive(self, item_id: int, alias: str = None) -> Optional[bool]:
+        """
+        Toggle the sensitive status of an item and set alias if provided.
+        Returns the new sensitive status, or None if the item doesn't exist.
+        """
+        with self._lock, self._conn as conn:
+            # Flip the flag and set or clear the alias in one statement;
+            # the CASE sees the pre-update value of is_sensitive
+            rows = conn.execute(_SQL_TOGGLE_SENSITIVE, (alias or DEFAULT_SENSITIVE_ALIAS, item_id)).fetchall()
+            self.version += 1
+            return bool(rows[0][0]) if rows else None
     
     def update_alias(self, item_id: int, alias: str) -> bool:
         """Update the alias for a sensitive item."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                UPDATE clipboard_items 
-                SET alias = ?
-                WHERE id = ? AND is_sensitive = 1
-            """, (alias, item_id))
-            conn.commit()
+            cursor.execute(_SQL_UPDATE_ALIAS, (alias, item_id))
+            self.version += 1
             return cursor.rowcount > 0
     
+    def _after_delete(self, conn: sqlite3.Connection, hashes: List[Tuple[bytes]]) -> int:
+        """
+        Drop texts no item references any more and reset cached state.
+        
+        Args:
+            conn: Connection inside the deleting transaction
+            hashes: content_hash rows returned by the delete
+            
+        Returns:
+            Number of items deleted
+        """
+        deleted = {digest for digest, in hashes}
+        conn.executemany(_SQL_DELETE_ORPHAN_CONTENT, ((digest, digest) for digest in deleted))
+        self.version += 1
+        self._get_item_content_cached.cache_clear()
+        # The newest item may have been among the deleted ones
+        self._last_hash = None
+        return len(hashes)
+    
     def delete_item(self, item_id: int) -> bool:
         """Delete a specific item from the database."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                DELETE FROM clipboard_items 
-                WHERE id = ?
-            """, (item_id,))
-            conn.commit()
-            return cursor.rowcount > 0
+            cursor.execute(_SQL_DELETE_ITEM, (item_id,))
+            return self._after_delete(conn, cursor.fetchall()) > 0
     
     def clear_unpinned_items(self) -> int:
         """Clear all unpinned items and return the number of items deleted."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                DELETE FROM clipboard_items 
-                WHERE is_pinned = 0
-            """)
-            conn.commit()
-            return cursor.rowcount
+        with self._lock:
+            with self._conn as conn:
+                cursor = conn.cursor()
+                cursor.execute(_SQL_CLEAR_UNPINNED)
+                deleted = self._after_delete(conn, cursor.fetchall())
+            
+            # A mass delete dirties many pages; fold them back and shrink the WAL
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            return deleted
     
     def cleanup_old_items(self, max_unpinned: int = 100):
         """Keep only the most recent max_unpinned non-pinned items."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            # Get IDs of items to keep (pinned + recent unpinned)
-            cursor.execute("""
-                SELECT id FROM clipboard_items 
-                WHERE is_pinned = 1
-                UNION
-                SELECT id FROM (
-                    SELECT id FROM clipboard_items 
-                    WHERE is_pinned = 0
-                    ORDER BY timestamp DESC
-                    LIMIT ?
-                )
-            """, (max_unpinned,))
-            
-            keep_ids = [str(row[0]) for row in cursor.fetchall()]
-            
-            if keep_ids:
-                # Delete items not in the keep list
-                cursor.execute(f"""
-                    DELETE FROM clipboard_items 
-                    WHERE id NOT IN ({','.join(['?'] * len(keep_ids))})
-                """, keep_ids)
-                conn.commit()
+            cursor.execute(_SQL_CLEANUP_UNPINNED, (max_unpinned,))
+            self._after_delete(conn, cursor.fetchall())
     
     def get_item_content(self, item_id: int) -> Optional[str]:
         """Get the content of a specific item."""
-        with sqlite3.connect(self.db_path) as conn:
+        return self._get_item_content_cached(item_id)
+    
+    def _fetch_item_content(self, item_id: int) -> Optional[str]:
+        """Read an item's content from the database, bypassing the cache."""
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT content FROM clipboard_items 
-                WHERE id = ?
-            """, (item_id,))
+            cursor.execute(_SQL_ITEM_CONTENT, (item_id,))
             result = cursor.fetchone()
             return result[0] if result else None
 
@@ -213,34 +757,28 @@ class BookmarksDB:
     def __init__(self, db_path: str = "clipboard_history.db"):
         """Initialize database connection and create bookmarks table if it doesn't exist."""
         self.db_path = db_path
-        self.init_bookmarks_table()
+        # Shared with any other ClipboardDB/BookmarksDB open on the same file
+        self._conn, self._lock = _get_conn(db_path)
+        # Per-instance cache for point lookups the GUI re-issues on edit/open
+        self._get_bookmark_cached = functools.lru_cache(maxsize=256)(self._fetch_bookmark)
+    
+    def close(self):
+        """Release the database connection; it is closed once no instance uses it."""
+        if self._conn is not None:
+            _release_conn(self._conn)
+            self._conn = None
     
     def init_bookmarks_table(self):
-        """Create the bookmarks table if it doesn't exist."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS bookmarks (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT NOT NULL,
-                    url TEXT NOT NULL,
-                    category TEXT NOT NULL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.commit()
+        """Create the database tables if they don't exist."""
+        with self._lock:
+            _ensure_schema(self._conn)
     
     def add_bookmark(self, title: str, description: str, url: str, category: str) -> bool:
         """Add a new bookmark to the database."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO bookmarks (title, description, url, category, timestamp)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (title, description, url, category, datetime.now()))
-                conn.commit()
+                cursor.execute(_SQL_INSERT_BOOKMARK, (title, description, url, category))
             return True
         except Exception as e:
             print(f"Error adding bookmark: {e}")
@@ -248,49 +786,51 @@ class BookmarksDB:
     
     def get_all_bookmarks(self) -> List[Tuple[int, str, str, str, str, str]]:
         """Get all bookmarks ordered by category and then by title."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, title, description, url, category, timestamp 
-                FROM bookmarks 
-                ORDER BY category, title
-            """)
+            cursor.execute(_SQL_SELECT_ALL_BOOKMARKS)
             return cursor.fetchall()
     
     def get_bookmarks_by_category(self, category: str) -> List[Tuple[int, str, str, str, str, str]]:
         """Get bookmarks filtered by category."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, title, description, url, category, timestamp 
-                FROM bookmarks 
-                WHERE category = ?
-                ORDER BY title
-            """, (category,))
+            cursor.execute(_SQL_SELECT_BOOKMARKS_BY_CATEGORY, (category,))
             return cursor.fetchall()
     
     def get_categories(self) -> List[str]:
         """Get all unique categories."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT DISTINCT category 
-                FROM bookmarks 
-                ORDER BY category
-            """)
+            cursor.execute(_SQL_SELECT_CATEGORIES)
             return [row[0] for row in cursor.fetchall()]
     
+    def get_bookmarks_and_categories(self, category: Optional[str] = None) -> Tuple[List[Tuple[int, str, str, str, str, str]], List[str]]:
+        """
+        Get bookmarks (optionally filtered by category) and all unique categories in one round-trip.
+        
+        Returns:
+            Tuple of (bookmarks, categories)
+        """
+        with self._lock, self._conn as conn:
+            cursor = conn.cursor()
+            if category is None:
+                cursor.execute(_SQL_SELECT_ALL_BOOKMARKS)
+            else:
+                cursor.execute(_SQL_SELECT_BOOKMARKS_BY_CATEGORY, (category,))
+            bookmarks = cursor.fetchall()
+            
+            cursor.execute(_SQL_SELECT_CATEGORIES)
+            categories = [row[0] for row in cursor.fetchall()]
+            return bookmarks, categories
+    
     def update_bookmark(self, bookmark_id: int, title: str, description: str, url: str, category: str) -> bool:
         """Update a bookmark."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    UPDATE bookmarks 
-                    SET title = ?, description = ?, url = ?, category = ?
-                    WHERE id = ?
-                """, (title, description, url, category, bookmark_id))
-                conn.commit()
+                cursor.execute(_SQL_UPDATE_BOOKMARK, (title, description, url, category, bookmark_id))
+                self._get_bookmark_cached.cache_clear()
                 return cursor.rowcount > 0
         except Exception as e:
             print(f"Error updating bookmark: {e}")
@@ -299,13 +839,10 @@ class BookmarksDB:
     def delete_bookmark(self, bookmark_id: int) -> bool:
         """Delete a bookmark from the database."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._lock, self._conn as conn:
                 cursor = conn.cursor()
-                cursor.execute("""
-                    DELETE FROM bookmarks 
-                    WHERE id = ?
-                """, (bookmark_id,))
-                conn.commit()
+                cursor.execute(_SQL_DELETE_BOOKMARK, (bookmark_id,))
+                self._get_bookmark_cached.cache_clear()
                 return cursor.rowcount > 0
         except Exception as e:
             print(f"Error deleting bookmark: {e}")
@@ -313,11 +850,11 @@ class BookmarksDB:
     
     def get_bookmark(self, bookmark_id: int) -> Optional[Tuple[int, str, str, str, str, str]]:
         """Get a specific bookmark by ID."""
-        with sqlite3.connect(self.db_path) as conn:
+        return self._get_bookmark_cached(bookmark_id)
+    
+    def _fetch_bookmark(self, bookmark_id: int) -> Optional[Tuple[int, str, str, str, str, str]]:
+        """Read a bookmark from the database, bypassing the cache."""
+        with self._lock, self._conn as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, title, description, url, category, timestamp 
-                FROM bookmarks 
-                WHERE id = ?
-            """, (bookmark_id,))
+            cursor.execute(_SQL_SELECT_BOOKMARK, (bookmark_id,))
             return cursor.fetchone()
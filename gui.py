@@ -5,9 +5,25 @@ Provides the main interface for viewing and managing clipboard history.
 
 import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
-import pyautogui
-from typing import Callable, List, Tuple, Optional
-from database import ClipboardDB
+from typing import Callable, Dict, List, Tuple, Optional
+from database import ClipboardDB, DISPLAY_LENGTH
+
+CLIPBOARD_COLUMNS = ("content", "pinned", "sensitive", "timestamp")
+
+# Rows are loaded a page at a time, the next page once the view nears the end
+HISTORY_PAGE_SIZE = 200
+HISTORY_ROW_HEIGHT = 22
+LOAD_MORE_THRESHOLD = 0.9
+
+# Row markers, also used as prefixes on the content column
+PIN = "📌"
+LOCK = "🔒"
+PIN_PREFIX = f"{PIN} "
+LOCK_PREFIX = f"{LOCK} "
+
+INSTRUCTIONS = "Double-click or press Enter to paste • Right-click for options"
+# How long a status message replaces the instructions
+STATUS_MS = 3000
 
 
 class ClipboardGUI:
@@ -24,6 +40,21 @@ class ClipboardGUI:
         self.root: Optional[tk.Tk] = None
         self.tree: Optional[ttk.Treeview] = None
         self.is_visible = False
+        # What each row currently shows: item_id -> (values, tags, sort key)
+        self._rendered: Dict[int, Tuple[tuple, tuple, tuple]] = {}
+        self._loaded_count = 0
+        self._has_more = False
+        # Sort key of the last row the database returned; the next page starts after it
+        self._cursor: Optional[tuple] = None
+        self._load_pending = False
+        # Search box text the list is filtered by, empty to show everything
+        self._query = ""
+        # Database version, row count and search the list was last loaded at
+        self._loaded_at: Optional[Tuple[int, int, str]] = None
+        # Action to run if the inline confirmation is accepted
+        self._confirm_action: Optional[Callable[[], None]] = None
+        # Pending timer that puts the instructions back after a status message
+        self._status_after: Optional[str] = None
         
     def create_window(self):
         """Create the main window."""
@@ -62,9 +93,14 @@ class ClipboardGUI:
         button_frame = ttk.Frame(main_frame)
         button_frame.pack(fill=tk.X, pady=(0, 10))
         
+        # Search box, filters the list as you type
+        self.search_entry = ttk.Entry(button_frame)
+        self.search_entry.pack(side=tk.RIGHT, fill=tk.X, expand=True)
+        ttk.Label(button_frame, text="Search:").pack(side=tk.RIGHT, padx=(5, 5))
+        
         # Buttons
         ttk.Button(button_frame, text="Refresh", 
-                  command=self.refresh_list).pack(side=tk.LEFT, padx=(0, 5))
+                  command=self.reload_list).pack(side=tk.LEFT, padx=(0, 5))
         
         ttk.Button(button_frame, text="Clear Unpinned", 
                   command=self.clear_unpinned).pack(side=tk.LEFT, padx=(0, 5))
@@ -72,19 +108,32 @@ class ClipboardGUI:
         ttk.Button(button_frame, text="Delete Selected", 
                   command=self.delete_selected).pack(side=tk.LEFT, padx=(0, 5))
         
-        # Instructions label
-        instructions = ttk.Label(main_frame, 
-                                text="Double-click or press Enter to paste • Right-click for options",
-                                foreground="gray")
-        instructions.pack(pady=(0, 5))
+        # Instructions label, also used for short status messages
+        self.instructions_label = ttk.Label(main_frame, text=INSTRUCTIONS, foreground="gray")
+        self.instructions_label.pack(pady=(0, 5))
+        
+        # Inline confirmation bar, shown above the list only while a question is pending
+        self.confirm_frame = ttk.Frame(main_frame)
+        self.confirm_label = ttk.Label(self.confirm_frame)
+        self.confirm_label.pack(side=tk.LEFT)
+        ttk.Button(self.confirm_frame, text="No",
+                   command=self._confirm_no).pack(side=tk.RIGHT)
+        self.confirm_yes_button = ttk.Button(self.confirm_frame, text="Yes", command=self._confirm_yes)
+        self.confirm_yes_button.pack(side=tk.RIGHT, padx=(0, 5))
+        self.confirm_yes_button.bind("<Return>", lambda e: self._confirm_yes())
+        # "break" keeps the window-wide Escape binding from hiding the window
+        self.confirm_yes_button.bind("<Escape>", lambda e: self._confirm_no() or "break")
         
         # Treeview frame with scrollbar
         tree_frame = ttk.Frame(main_frame)
         tree_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Fixed row height, so the tree never has to work it out from the font
+        ttk.Style(self.root).configure("History.Treeview", rowheight=HISTORY_ROW_HEIGHT)
+        
         # Create treeview with additional column for sensitive data
-        columns = ("content", "pinned", "sensitive", "timestamp")
-        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings", height=15)
+        self.tree = ttk.Treeview(tree_frame, columns=CLIPBOARD_COLUMNS, show="headings", height=15,
+                                 style="History.Treeview")
         
         # Configure columns
         self.tree.heading("content", text="Content")
@@ -92,18 +141,24 @@ class ClipboardGUI:
         self.tree.heading("sensitive", text="Sensitive")
         self.tree.heading("timestamp", text="Timestamp")
         
+        # Only the content column stretches; the others keep their final width
         self.tree.column("content", width=300, minwidth=200)
-        self.tree.column("pinned", width=60, minwidth=50)
-        self.tree.column("sensitive", width=70, minwidth=60)
-        self.tree.column("timestamp", width=150, minwidth=100)
+        self.tree.column("pinned", width=60, stretch=False)
+        self.tree.column("sensitive", width=70, stretch=False)
+        self.tree.column("timestamp", width=150, stretch=False)
+        
+        # Row colors by tag
+        self.tree.tag_configure("sensitive", background="#ffe6e6")  # Light red background
+        self.tree.tag_configure("pinned", background="#e6f3ff")     # Light blue background
         
         # Scrollbar
-        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        # Every scroll (bar, wheel or keyboard) reports here, which drives paging
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
         
         # Pack treeview and scrollbar
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Context menu (will be populated dynamically)
         self.context_menu = tk.Menu(self.root, tearoff=0)
@@ -124,6 +179,10 @@ class ClipboardGUI:
         
         # Delete key to delete item
         self.tree.bind("<Delete>", lambda e: self.delete_selected())
+        
+        # Search as you type; Down moves on to the results
+        self.search_entry.bind("<KeyRelease>", self._on_search)
+        self.search_entry.bind("<Down>", lambda e: self._focus_results())
     
     def _show_context_menu(self, event):
         """Show context menu at cursor position."""
@@ -143,14 +202,10 @@ class ClipboardGUI:
         if not item_id:
             return
         
-        # Get item details
-        items = self.db.get_all_items()
-        current_item = next((item for item in items if item[0] == item_id), None)
-        if not current_item:
+        is_sensitive = self._is_sensitive(item_id)
+        if is_sensitive is None:
             return
         
-        is_sensitive = current_item[3]  # is_sensitive column
-        
         # Clear the menu
         self.context_menu.delete(0, tk.END)
         
@@ -191,65 +246,224 @@ class ClipboardGUI:
     def hide_window(self):
         """Hide the clipboard manager window."""
         if self.root:
+            self._hide_confirm()
             self.root.withdraw()
             self.is_visible = False
     
+    @staticmethod
+    def _render_row(row: Tuple[int, str, bool, bool, str, str]) -> Tuple[tuple, tuple, tuple]:
+        """
+        Work out how a database row is shown in the treeview.
+        
+        Args:
+            row: Item row as returned by the database's *_for_display methods,
+                 which already pick the alias, flatten and cut the content and
+                 trim the timestamp
+            
+        Returns:
+            The row's column values, its tags, and a key that sorts like the
+            database listing (pinned first, then newest first)
+        """
+        item_id, display_content, is_pinned, is_sensitive, formatted_time, timestamp = row
+        
+        # Only over-long content comes back with more than DISPLAY_LENGTH
+        # characters; a sensitive item's alias is shown in full
+        if not is_sensitive and len(display_content) > DISPLAY_LENGTH:
+            display_content = f"{display_content[:DISPLAY_LENGTH - 3]}..."
+        
+        # Styling is decided up front so each row takes a single insert
+        if is_sensitive:
+            display_content = LOCK_PREFIX + display_content
+            tags = ("sensitive",)
+        elif is_pinned:
+            display_content = PIN_PREFIX + display_content
+            tags = ("pinned",)
+        else:
+            tags = ()
+        
+        values = (display_content, PIN if is_pinned else "", LOCK if is_sensitive else "", formatted_time)
+        return values, tags, (bool(is_pinned), timestamp, item_id)
+    
     def refresh_list(self):
-        """Refresh the clipboard items list."""
+        """Refresh the clipboard items list, touching only rows that changed."""
         if not self.tree:
             return
         
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Get items from database
-        items = self.db.get_all_items()
-        
-        # Add items to treeview
-        for item_id, content, is_pinned, is_sensitive, alias, timestamp in items:
-            # Use alias for display if item is sensitive and has an alias
-            if is_sensitive and alias:
-                display_content = alias
-            else:
-                # Truncate content for display
-                display_content = content.replace('\n', ' ').replace('\r', '')
-                if len(display_content) > 80:
-                    display_content = display_content[:77] + "..."
-            
-            pinned_text = "📌" if is_pinned else ""
-            sensitive_text = "🔒" if is_sensitive else ""
-            
-            # Format timestamp
-            formatted_time = timestamp.split('.')[0] if '.' in timestamp else timestamp
+        # Reload everything loaded so far, at least one page
+        limit = max(self._loaded_count, HISTORY_PAGE_SIZE)
+        
+        # Nothing changed since the last load, e.g. showing the window twice
+        loaded_at = (self.db.version, limit, self._query)
+        if loaded_at == self._loaded_at:
+            return
+        self._loaded_at = loaded_at
+        
+        rows = self._fetch_rows(limit)
+        self._loaded_count = len(rows)
+        self._has_more = len(rows) == limit
+        
+        # Work out what each row should show
+        render_row = self._render_row
+        snapshot = {row[0]: render_row(row) for row in rows}
+        
+        tree = self.tree
+        rendered = self._rendered
+        removed = [item_id for item_id in rendered if item_id not in snapshot]
+        if removed:
+            tree.delete(*removed)
+        
+        # Locals keep attribute lookups out of the per-row loop
+        insert, update, get_previous, end = tree.insert, tree.item, rendered.get, tk.END
+        for item_id, (values, tags, _) in snapshot.items():
+            previous = get_previous(item_id)
+            if previous is None:
+                insert("", end, iid=item_id, values=values, tags=tags)
+            elif previous[:2] != (values, tags):
+                update(item_id, values=values, tags=tags)
+        
+        # New rows went in at the end; put everything in listing order in one call
+        order = tuple(str(item_id) for item_id in snapshot)
+        if tree.get_children() != order:
+            tree.set_children("", *order)
+        
+        self._rendered = snapshot
+        self._cursor = snapshot[rows[-1][0]][2] if rows else None
+    
+    def reload_list(self):
+        """Reload the list even if this app made no changes, e.g. after another process wrote to the database."""
+        self._loaded_at = None
+        self.refresh_list()
+    
+    def _fetch_rows(self, limit: int, after: Optional[tuple] = None) -> List[Tuple[int, str, bool, bool, str, str]]:
+        """
+        Load display rows for the list, honouring the current search.
+        
+        Args:
+            limit: Maximum number of rows to load
+            after: Sort key of the last row already shown, or None to start at the top
             
-            # Insert item with ID as tag
-            item_ref = self.tree.insert("", tk.END, 
-                                      values=(display_content, pinned_text, sensitive_text, formatted_time),
-                                      tags=(str(item_id),))
+        Returns:
+            Rows as returned by the database's *_for_display methods
+        """
+        if self._query:
+            return self.db.search_items_for_display(self._query, limit, after)
+        if after is None:
+            return self.db.get_items_for_display(limit)
+        return self.db.get_items_for_display_after(after, limit)
+    
+    def _on_search(self, event=None):
+        """Filter the list by the search box text."""
+        query = self.search_entry.get().strip()
+        if query == self._query:
+            # Arrow keys, modifiers and the like
+            return
+        self._query = query
+        # A new search starts over at the first page
+        self._loaded_count = 0
+        self.refresh_list()
+        self.tree.yview_moveto(0)
+    
+    def _focus_results(self):
+        """Move keyboard focus from the search box to the first result."""
+        items = self.tree.get_children()
+        if items:
+            self.tree.selection_set(items[0])
+            self.tree.focus(items[0])
+        self.tree.focus_set()
+    
+    def _on_tree_scroll(self, first: str, last: str):
+        """Keep the scrollbar in sync and load the next page near the bottom."""
+        self.scrollbar.set(first, last)
+        if self._has_more and not self._load_pending and float(last) > LOAD_MORE_THRESHOLD:
+            # Don't insert rows from inside the treeview's own scroll callback
+            self._load_pending = True
+            self.root.after_idle(self._load_more)
+    
+    def _load_more(self):
+        """Append the next page of items to the list."""
+        self._load_pending = False
+        if not self.tree or not self._has_more:
+            return
+        
+        # Continue from the last row fetched rather than skipping _loaded_count rows
+        rows = self._fetch_rows(HISTORY_PAGE_SIZE, self._cursor)
+        self._loaded_count += len(rows)
+        self._has_more = len(rows) == HISTORY_PAGE_SIZE
+        
+        insert, render_row, rendered, end = self.tree.insert, self._render_row, self._rendered, tk.END
+        for row in rows:
+            values, tags, self._cursor = row_rendered = render_row(row)
+            # Rows shown since the page was fetched (e.g. newly pinned) are already in place
+            item_id = row[0]
+            if item_id in rendered:
+                continue
+            rendered[item_id] = row_rendered
+            insert("", end, iid=item_id, values=values, tags=tags)
+    
+    def _apply_change(self, item_id: int):
+        """
+        Update a single row after its item changed, without reloading the list.
+        
+        Args:
+            item_id: ID of the item that was changed or deleted
+        """
+        if not self.tree:
+            return
+        
+        row = self.db.get_item_for_display(item_id)
+        if row is None:
+            # Item is gone
+            if self._rendered.pop(item_id, None) is not None:
+                self.tree.delete(item_id)
+            return
+        
+        previous = self._rendered.get(item_id)
+        if previous is None:
+            # Not shown yet, so the list is out of date anyway
+            self.refresh_list()
+            return
+        
+        values, tags, key = rendered = self._render_row(row)
+        if self._has_more and key < self._cursor:
+            # Now sorts among rows not loaded yet (e.g. unpinned); it comes back
+            # in its place with the page that holds it
+            del self._rendered[item_id]
+            self.tree.delete(item_id)
+            return
+        
+        self._rendered[item_id] = rendered
+        self.tree.item(item_id, values=values, tags=tags)
+        
+        if key != previous[2]:
+            # Pinning moves the row; its new index is the number of rows sorting ahead of it
+            index = sum(1 for other_key in (r[2] for r in self._rendered.values()) if other_key > key)
+            self.tree.move(item_id, "", index)
+    
+    def _is_sensitive(self, item_id: int) -> Optional[bool]:
+        """
+        Tell whether an item is sensitive, from its row when it is shown.
+        
+        Args:
+            item_id: ID of the item
             
-            # Apply special styling for sensitive items
-            if is_sensitive:
-                self.tree.set(item_ref, "content", f"🔒 {display_content}")
-                # Tag sensitive items for different coloring
-                self.tree.item(item_ref, tags=(str(item_id), "sensitive"))
-            elif is_pinned:
-                self.tree.set(item_ref, "content", f"📌 {display_content}")
-                self.tree.item(item_ref, tags=(str(item_id), "pinned"))
-        
-        # Configure tag colors
-        self.tree.tag_configure("sensitive", background="#ffe6e6")  # Light red background
-        self.tree.tag_configure("pinned", background="#e6f3ff")     # Light blue background
+        Returns:
+            The item's sensitive status, or None if it doesn't exist
+        """
+        rendered = self._rendered.get(item_id)
+        if rendered is not None:
+            return "sensitive" in rendered[1]
+        
+        # Not in the list; ask the database
+        current_item = self.db.get_item(item_id)
+        if not current_item:
+            return None
+        return bool(current_item[3])  # is_sensitive column
     
     def get_selected_item_id(self) -> Optional[int]:
         """Get the ID of the currently selected item."""
+        # Items are inserted with the item ID as their iid
         selection = self.tree.selection()
-        if not selection:
-            return None
-        
-        item = selection[0]
-        tags = self.tree.item(item, "tags")
-        return int(tags[0]) if tags else None
+        return int(selection[0]) if selection else None
     
     def paste_selected(self):
         """Paste the selected clipboard item."""
@@ -265,8 +479,8 @@ class ClipboardGUI:
     def toggle_pin_selected(self):
         """Toggle pin status of the selected item."""
         item_id = self.get_selected_item_id()
-        if item_id and self.db.toggle_pin(item_id):
-            self.refresh_list()
+        if item_id and self.db.toggle_pin(item_id) is not None:
+            self._apply_change(item_id)
     
     def toggle_sensitive_selected(self):
         """Toggle sensitive status of the selected item."""
@@ -275,13 +489,10 @@ class ClipboardGUI:
             return
         
         # Check current sensitive status
-        items = self.db.get_all_items()
-        current_item = next((item for item in items if item[0] == item_id), None)
-        if not current_item:
+        is_currently_sensitive = self._is_sensitive(item_id)
+        if is_currently_sensitive is None:
             return
         
-        is_currently_sensitive = current_item[3]  # is_sensitive column
-        
         if not is_currently_sensitive:
             # Making item sensitive - ask for alias
             alias = simpledialog.askstring(
@@ -291,12 +502,12 @@ class ClipboardGUI:
             )
             
             if alias is not None:  # User didn't cancel
-                if self.db.toggle_sensitive(item_id, alias):
-                    self.refresh_list()
+                if self.db.toggle_sensitive(item_id, alias) is not None:
+                    self._apply_change(item_id)
         else:
             # Removing sensitive status
-            if self.db.toggle_sensitive(item_id):
-                self.refresh_list()
+            if self.db.toggle_sensitive(item_id) is not None:
+                self._apply_change(item_id)
     
     def edit_alias_selected(self):
         """Edit the alias of a sensitive item."""
@@ -305,8 +516,7 @@ class ClipboardGUI:
             return
         
         # Check if item is sensitive
-        items = self.db.get_all_items()
-        current_item = next((item for item in items if item[0] == item_id), None)
+        current_item = self.db.get_item(item_id)
         if not current_item or not current_item[3]:  # is_sensitive column
             messagebox.showwarning("Not Sensitive", "This item is not marked as sensitive.")
             return
@@ -321,7 +531,7 @@ class ClipboardGUI:
         
         if new_alias is not None and new_alias.strip():  # User didn't cancel and provided text
             if self.db.update_alias(item_id, new_alias.strip()):
-                self.refresh_list()
+                self._apply_change(item_id)
     
     def delete_selected(self):
         """Delete the selected item."""
@@ -329,19 +539,81 @@ class ClipboardGUI:
         if not item_id:
             return
         
-        if messagebox.askyesno("Confirm Delete", "Are you sure you want to delete this item?"):
+        def delete():
             if self.db.delete_item(item_id):
-                self.refresh_list()
+                self._apply_change(item_id)
+        
+        self._ask_inline("Are you sure you want to delete this item?", delete)
     
     def clear_unpinned(self):
         """Clear all unpinned items."""
-        if messagebox.askyesno("Confirm Clear", "Clear all unpinned items?"):
+        def clear():
             count = self.db.clear_unpinned_items()
             self.refresh_list()
-            messagebox.showinfo("Cleared", f"Removed {count} unpinned items.")
+            self._show_status(f"Removed {count} unpinned items.")
+        
+        self._ask_inline("Clear all unpinned items?", clear)
+    
+    def _ask_inline(self, message: str, on_yes: Callable[[], None]):
+        """
+        Ask a yes/no question in the bar above the list instead of a modal dialog.
+        
+        Args:
+            message: Question to show
+            on_yes: Function to call if the user answers Yes
+        """
+        self._confirm_action = on_yes
+        self.confirm_label.configure(text=message)
+        self.confirm_frame.pack(fill=tk.X, pady=(0, 5), before=self.tree.master)
+        # Enter answers Yes, Escape answers No
+        self.confirm_yes_button.focus_set()
+    
+    def _show_status(self, message: str):
+        """
+        Show a short message in place of the instructions, without a dialog.
+        
+        Args:
+            message: Text to show for STATUS_MS milliseconds
+        """
+        if self._status_after:
+            self.root.after_cancel(self._status_after)
+        self.instructions_label.configure(text=message)
+        self._status_after = self.root.after(STATUS_MS, self._clear_status)
+    
+    def _clear_status(self):
+        """Put the instructions back after a status message."""
+        self._status_after = None
+        self.instructions_label.configure(text=INSTRUCTIONS)
+    
+    def _hide_confirm(self):
+        """Hide the confirmation bar and forget its pending action."""
+        self._confirm_action = None
+        self.confirm_frame.pack_forget()
+    
+    def _confirm_yes(self):
+        """Run the pending action after the user accepted it."""
+        action = self._confirm_action
+        self._hide_confirm()
+        self.tree.focus_set()
+        if action:
+            action()
+    
+    def _confirm_no(self):
+        """Dismiss the pending question without doing anything."""
+        self._hide_confirm()
+        self.tree.focus_set()
     
     def destroy(self):
         """Destroy the window."""
         if self.root:
             self.root.destroy()
             self.root = None
+            self.tree = None
+            self._rendered = {}
+            self._loaded_count = 0
+            self._has_more = False
+            self._cursor = None
+            self._status_after = None
+            self._load_pending = False
+            self._query = ""
+            self._loaded_at = None
@@ -11,19 +11,31 @@ Features:
 - Automatic database backup
 """
 
-import tkinter as tk
-import keyboard
-import pyautogui
+import signal
+import sqlite3
 import threading
 import time
 import sys
-import queue
 import os
+from typing import Optional
 from dotenv import load_dotenv
-from clipboard_monitor import ClipboardMonitor
-from database import ClipboardDB, BookmarksDB
-from gui import ClipboardGUI
-from backup_manager import create_backup_if_enabled
+from clipboard_monitor import ClipboardMonitor, MIN_POLL_INTERVAL, MAX_POLL_INTERVAL
+from database import ClipboardDB, MIN_SQLITE_VERSION, sqlite_has_fts5
+from win32_utils import (
+    HotkeyListener, MOD_CONTROL, MOD_SHIFT, send_paste, wait_for_foreground_release,
+)
+
+# Clipboard polling (only used without native notifications) stays fast while
+# the user has been active within IDLE_AFTER seconds, checked every ACTIVITY_CHECK_MS
+IDLE_AFTER = 30
+ACTIVITY_CHECK_MS = 1000
+
+# Longest startup waits for the hotkey listener to report its registrations
+HOTKEY_REGISTER_TIMEOUT = 2.0
+
+# Python only runs signal handlers between Tcl events, so Tk is woken this
+# often to let a console Ctrl+C through
+SIGNAL_CHECK_MS = 250
 
 
 class PasteyApp:
@@ -36,13 +48,17 @@ class PasteyApp:
         self._setup_database_and_backup()
         
         # Initialize components
-        self.clipboard_monitor = ClipboardMonitor(self.on_clipboard_change)
-        self.gui = ClipboardGUI(self.db, self.on_paste_content)
+        self.clipboard_monitor = ClipboardMonitor(self.on_clipboard_change, self.on_polling_started)
+        # The GUI (tkinter) is imported and hotkeys registered in start(),
+        # once monitoring is already running
+        self.gui = None
+        self.hotkeys = None
         self.running = True
-        self.gui_queue = queue.Queue()
-        
-        # Setup global hotkey
-        self.setup_hotkeys()
+        self._last_activity = time.monotonic()
+        # Whether polling was last set to the idle rate; None until first checked
+        self._idle: Optional[bool] = None
+        # Whether the poll interval is being adapted; only touched on the Tk thread
+        self._adapting = False
         
         print("Pastey Clipboard Manager started!")
         print("Press Ctrl+Shift+Z to open clipboard history")
@@ -57,40 +73,69 @@ class PasteyApp:
         backup_enabled = os.getenv('BACKUP_ENABLED', 'true').lower() == 'true'
         
         if backup_enabled:
-            print("💾 Creating database backup...")
             backup_path = os.getenv('BACKUP_PATH', '')
             max_backups = int(os.getenv('MAX_BACKUP_FILES', '10'))
             
             if backup_path:
-                try:
-                    success = create_backup_if_enabled(
-                        self.db.db_path, 
-                        backup_path, 
-                        max_backups
-                    )
-                    if success:
-                        print("✅ Database backup completed successfully!")
-                    else:
-                        print("⚠️  Database backup failed, continuing without backup...")
-                except Exception as e:
-                    print(f"⚠️  Backup error: {e}")
-                    print("Continuing without backup...")
+                print("💾 Creating database backup in the background...")
+                # Not a daemon, so exiting early still lets the backup finish
+                # instead of leaving a half-written file behind
+                threading.Thread(
+                    target=self._run_backup,
+                    args=(backup_path, max_backups),
+                    name="pastey-backup",
+                ).start()
             else:
                 print("ℹ️  Backup disabled: BACKUP_PATH not configured in .env file")
         else:
             print("ℹ️  Backup disabled in configuration")
     
+    def _run_backup(self, backup_path: str, max_backups: int):
+        """
+        Back up the database; runs on its own thread so startup doesn't wait for it.
+        
+        Args:
+            backup_path: Backup directory path
+            max_backups: Maximum number of backups to keep
+        """
+        try:
+            # Only needed when backups are configured
+            from backup_manager import create_backup_if_enabled
+            
+            success = create_backup_if_enabled(
+                self.db.db_path, 
+                backup_path, 
+                max_backups
+            )
+            if success:
+                print("✅ Database backup completed successfully!")
+            else:
+                print("⚠️  Database backup failed, continuing without backup...")
+        except Exception as e:
+            print(f"⚠️  Backup error: {e}")
+            print("Continuing without backup...")
+    
     def setup_hotkeys(self):
         """Setup global hotkeys for the application."""
         try:
-            # Clear any existing hotkeys first
-            keyboard.unhook_all()
+            # Registered with Windows directly, so only these combinations ever
+            # reach Python rather than every keystroke on the system
+            self.hotkeys = HotkeyListener()
             
             # Hotkey to show clipboard manager
-            keyboard.add_hotkey('ctrl+shift+z', self.toggle_gui, suppress=True)
+            self.hotkeys.add_hotkey(MOD_CONTROL | MOD_SHIFT, ord('Z'), self.toggle_gui)
             
             # Alternative hotkey to exit application (use a different combination)
-            keyboard.add_hotkey('ctrl+shift+q', self.exit_app, suppress=True)
+            self.hotkeys.add_hotkey(MOD_CONTROL | MOD_SHIFT, ord('Q'), self.exit_app)
+            
+            hotkey_thread = threading.Thread(target=self.hotkeys.run, daemon=True)
+            hotkey_thread.start()
+            
+            # Windows registers them on the listener thread; wait for the outcome
+            if not self.hotkeys.registered.wait(timeout=HOTKEY_REGISTER_TIMEOUT):
+                raise TimeoutError("the hotkey listener did not start")
+            if self.hotkeys.failures:
+                raise OSError("; ".join(error for _, _, error in self.hotkeys.failures))
             
             print("Global hotkeys registered:")
             print("  Ctrl+Shift+Z - Open clipboard manager")
@@ -98,7 +143,7 @@ class PasteyApp:
             
         except Exception as e:
             print(f"Error setting up hotkeys: {e}")
-            print("You may need to run as administrator for global hotkeys to work.")
+            print("Another application may already be using these key combinations.")
     
     def on_clipboard_change(self, content: str):
         """
@@ -107,13 +152,15 @@ class PasteyApp:
         Args:
             content: New clipboard content
         """
+        self._last_activity = time.monotonic()
+        
         # Filter out very short content and whitespace-only content
         if len(content.strip()) < 2:
             return
         
-        # Add to database
-        if self.db.add_item(content):
-            print(f"New clipboard item added: {content[:50]}...")
+        # Hand off to the database writer thread so monitoring never blocks on disk
+        if self.db.add_item_async(content):
+            print(f"New clipboard item queued: {content[:50]}...")
     
     def on_paste_content(self, content: str):
         """
@@ -123,14 +170,17 @@ class PasteyApp:
             content: Content to paste
         """
         try:
-            # Set clipboard content
+            # Set clipboard content; the write is complete when this returns
             self.clipboard_monitor.set_content(content)
             
-            # Wait a moment for clipboard to update
-            time.sleep(0.1)
+            # The window was just hidden: paste as soon as focus is back on the
+            # target application instead of after a fixed delay
+            wait_for_foreground_release()
             
             # Send Ctrl+V to paste
-            pyautogui.hotkey('ctrl', 'v')
+            if not send_paste():
+                print("Error pasting content: the paste keystroke was blocked")
+                return
             
             print(f"Pasted content: {content[:50]}...")
             
@@ -139,32 +189,45 @@ class PasteyApp:
     
     def toggle_gui(self):
         """Toggle the GUI visibility - called from hotkey thread."""
+        self._last_activity = time.monotonic()
+        self._call_in_gui_thread(self._do_toggle)
+    
+    def _call_in_gui_thread(self, func) -> bool:
+        """
+        Schedule a function to run on the Tk thread. Safe to call from any thread.
+        
+        Args:
+            func: Function to run once Tk is idle
+            
+        Returns:
+            True if the call was scheduled
+        """
+        root = self.gui.root if self.gui else None
+        if not root:
+            return False
+        
         try:
-            # Put the toggle request in the queue for the main thread to process
-            self.gui_queue.put(('toggle', None))
-                
+            # tkinter hands calls made from other threads over to the thread
+            # running mainloop, so this wakes Tk directly with no polling
+            root.after_idle(func)
+            return True
         except Exception as e:
-            print(f"Error toggling GUI: {e}")
+            print(f"Error scheduling GUI update: {e}")
+            return False
     
-    def _process_gui_queue(self):
-        """Process GUI events from the queue - called from main thread."""
+    def _do_toggle(self):
+        """Show or hide the window - runs on the Tk thread."""
         try:
-            while not self.gui_queue.empty():
-                action, data = self.gui_queue.get_nowait()
+            if not self.gui.root:
+                self.gui.create_window()
+            
+            if self.gui.is_visible:
+                self.gui.hide_window()
+            else:
+                self.gui.show_window()
                 
-                if action == 'toggle':
-                    if not self.gui.root:
-                        self.gui.create_window()
-                    
-                    if self.gui.is_visible:
-                        self.gui.hide_window()
-                    else:
-                        self.gui.show_window()
-                        
-        except queue.Empty:
-            pass
         except Exception as e:
-            print(f"Error processing GUI queue: {e}")
+            print(f"Error toggling GUI: {e}")
     
     def start(self):
         """Start the application."""
@@ -172,9 +235,15 @@ class PasteyApp:
         monitor_thread = threading.Thread(target=self._start_monitoring, daemon=True)
         monitor_thread.start()
         
-        # Create the GUI window (hidden initially)
+        # Create the GUI window (hidden initially). It must exist before the
+        # hotkeys are registered, since they are handed over to its Tk thread
+        from gui import ClipboardGUI
+        self.gui = ClipboardGUI(self.db, self.on_paste_content)
         self.gui.create_window()
         
+        # Setup global hotkeys; a failure here doesn't affect monitoring
+        self.setup_hotkeys()
+        
         # Start the main event loop in the main thread
         self.run_main_loop()
     
@@ -182,26 +251,53 @@ class PasteyApp:
         """Start clipboard monitoring in background thread."""
         self.clipboard_monitor.start_monitoring()
     
+    def on_polling_started(self):
+        """Called on the monitor thread once it falls back to polling the clipboard."""
+        self._call_in_gui_thread(self._start_poll_adaptation)
+    
+    def _start_poll_adaptation(self):
+        """Start adapting the poll interval, once - runs on the Tk thread."""
+        if self._adapting:
+            return
+        self._adapting = True
+        self._adapt_poll_interval()
+    
+    def _adapt_poll_interval(self):
+        """Poll the clipboard quickly while the user is active and back off when idle."""
+        idle = time.monotonic() - self._last_activity > IDLE_AFTER
+        if idle != self._idle:
+            self._idle = idle
+            self.clipboard_monitor.set_interval(MAX_POLL_INTERVAL if idle else MIN_POLL_INTERVAL)
+        
+        self.gui.root.after(ACTIVITY_CHECK_MS, self._adapt_poll_interval)
+    
+    def _on_sigint(self, signum, frame):
+        """Shut down on a console Ctrl+C - runs on the Tk thread."""
+        print("\nReceived keyboard interrupt")
+        self.exit_app()
+    
+    def _heartbeat(self):
+        """Return control to Python regularly so pending signals get handled."""
+        self.gui.root.after(SIGNAL_CHECK_MS, self._heartbeat)
+    
     def run_main_loop(self):
         """Run the main application loop in the main thread."""
         try:
-            while self.running:
-                # Process GUI events from queue
-                self._process_gui_queue()
-                
-                # Process GUI events
-                if self.gui.root:
-                    try:
-                        self.gui.root.update()
-                    except tk.TclError:
-                        # Window was destroyed
-                        break
-                
-                # Small sleep to prevent high CPU usage
-                time.sleep(0.01)
-                
-        except KeyboardInterrupt:
-            print("\nReceived keyboard interrupt")
+            # A KeyboardInterrupt raised inside a Tk callback would only be
+            # reported, so Ctrl+C exits through the normal shutdown path instead
+            signal.signal(signal.SIGINT, self._on_sigint)
+            self.gui.root.after(SIGNAL_CHECK_MS, self._heartbeat)
+            
+            # Tk blocks in its own event loop until there is input or a timer is due;
+            # hotkeys wake it through after_idle from the hotkey thread.
+            # Native notifications need no poll interval, so Tk only wakes every
+            # second for it once the monitor has fallen back to polling; if that
+            # happened before the window existed, on_polling_started missed it
+            if self.clipboard_monitor.polling:
+                self.gui.root.after_idle(self._start_poll_adaptation)
+            if self.running:
+                self.gui.root.mainloop()
+            
         except Exception as e:
             print(f"Error in main loop: {e}")
         finally:
@@ -210,7 +306,14 @@ class PasteyApp:
     def exit_app(self):
         """Exit the application."""
         print("\nShutting down Pastey...")
+        # Checked before entering the Tk main loop, so an exit requested
+        # before it runs still stops the application
         self.running = False
+        self._call_in_gui_thread(self._do_exit)
+    
+    def _do_exit(self):
+        """Leave the Tk main loop - runs on the Tk thread."""
+        self.gui.root.quit()
     
     def cleanup(self):
         """Clean up resources before exit."""
@@ -219,12 +322,16 @@ class PasteyApp:
             self.clipboard_monitor.stop_monitoring()
             
             # Remove hotkeys
-            keyboard.unhook_all()
+            if self.hotkeys:
+                self.hotkeys.stop()
             
             # Destroy GUI
-            if self.gui.root:
+            if self.gui and self.gui.root:
                 self.gui.destroy()
             
+            # Close database connection
+            self.db.close()
+            
             print("Cleanup completed.")
             
         except Exception as e:
@@ -239,6 +346,19 @@ def main():
             print("This application is designed for Windows only.")
             return
         
+        # Older SQLite builds fail on the first toggle or schema migration
+        if sqlite3.sqlite_version_info < MIN_SQLITE_VERSION:
+            required = ".".join(map(str, MIN_SQLITE_VERSION))
+            print(f"❌ Pastey needs SQLite {required} or newer, but this Python has SQLite {sqlite3.sqlite_version}.")
+            print("Please install a newer Python (3.10+ ships a recent enough SQLite).")
+            return
+        
+        # The history's search index is an FTS5 table, created on first start
+        if not sqlite_has_fts5():
+            print(f"❌ Pastey needs SQLite with FTS5, but this Python's SQLite {sqlite3.sqlite_version} was built without it.")
+            print("Please install Python from python.org, whose SQLite includes FTS5.")
+            return
+        
         # Create and start the application
         app = PasteyApp()
         app.start()
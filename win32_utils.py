@@ -0,0 +1,446 @@
+"""
+Win32 helpers for clipboard manager.
+Thin ctypes wrappers around the native Windows APIs used by Pastey.
+"""
+
+import sys
+import time
+import ctypes
+import threading
+from typing import Callable, List, Tuple
+
+IS_WINDOWS = sys.platform == "win32"
+
+WM_CLOSE = 0x0010
+WM_DESTROY = 0x0002
+WM_CLIPBOARDUPDATE = 0x031D
+WM_QUIT = 0x0012
+WM_USER = 0x0400
+WM_HOTKEY = 0x0312
+PM_NOREMOVE = 0x0000
+
+MOD_ALT = 0x0001
+MOD_CONTROL = 0x0002
+MOD_SHIFT = 0x0004
+MOD_NOREPEAT = 0x4000
+
+INPUT_KEYBOARD = 1
+KEYEVENTF_KEYUP = 0x0002
+MAPVK_VK_TO_VSC = 0
+VK_CONTROL = 0x11
+VK_V = 0x56
+
+CF_UNICODETEXT = 13
+GMEM_MOVEABLE = 0x0002
+
+if IS_WINDOWS:
+    from ctypes import wintypes
+
+    user32 = ctypes.WinDLL("user32", use_last_error=True)
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+
+    LRESULT = wintypes.LPARAM
+    WNDPROC = ctypes.WINFUNCTYPE(LRESULT, wintypes.HWND, wintypes.UINT,
+                                 wintypes.WPARAM, wintypes.LPARAM)
+
+    HWND_MESSAGE = wintypes.HWND(-3)
+    ERROR_CLASS_ALREADY_EXISTS = 1410
+
+    class WNDCLASSW(ctypes.Structure):
+        _fields_ = [
+            ("style", wintypes.UINT),
+            ("lpfnWndProc", WNDPROC),
+            ("cbClsExtra", ctypes.c_int),
+            ("cbWndExtra", ctypes.c_int),
+            ("hInstance", wintypes.HINSTANCE),
+            ("hIcon", wintypes.HICON),
+            ("hCursor", wintypes.HANDLE),
+            ("hbrBackground", wintypes.HBRUSH),
+            ("lpszMenuName", wintypes.LPCWSTR),
+            ("lpszClassName", wintypes.LPCWSTR),
+        ]
+
+    ULONG_PTR = ctypes.c_size_t
+
+    class MOUSEINPUT(ctypes.Structure):
+        _fields_ = [
+            ("dx", wintypes.LONG),
+            ("dy", wintypes.LONG),
+            ("mouseData", wintypes.DWORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ULONG_PTR),
+        ]
+
+    class KEYBDINPUT(ctypes.Structure):
+        _fields_ = [
+            ("wVk", wintypes.WORD),
+            ("wScan", wintypes.WORD),
+            ("dwFlags", wintypes.DWORD),
+            ("time", wintypes.DWORD),
+            ("dwExtraInfo", ULONG_PTR),
+        ]
+
+    class HARDWAREINPUT(ctypes.Structure):
+        _fields_ = [
+            ("uMsg", wintypes.DWORD),
+            ("wParamL", wintypes.WORD),
+            ("wParamH", wintypes.WORD),
+        ]
+
+    # The union must include every member so INPUT has the size SendInput expects
+    class _INPUTUNION(ctypes.Union):
+        _fields_ = [("mi", MOUSEINPUT), ("ki", KEYBDINPUT), ("hi", HARDWAREINPUT)]
+
+    class INPUT(ctypes.Structure):
+        _anonymous_ = ("u",)
+        _fields_ = [("type", wintypes.DWORD), ("u", _INPUTUNION)]
+
+    kernel32.GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+    kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+
+    user32.RegisterClassW.argtypes = [ctypes.POINTER(WNDCLASSW)]
+    user32.RegisterClassW.restype = wintypes.ATOM
+    user32.CreateWindowExW.argtypes = [
+        wintypes.DWORD, wintypes.LPCWSTR, wintypes.LPCWSTR, wintypes.DWORD,
+        ctypes.c_int, ctypes.c_int, ctypes.c_int, ctypes.c_int,
+        wintypes.HWND, wintypes.HMENU, wintypes.HINSTANCE, wintypes.LPVOID,
+    ]
+    user32.CreateWindowExW.restype = wintypes.HWND
+    user32.DefWindowProcW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+    user32.DefWindowProcW.restype = LRESULT
+    user32.DestroyWindow.argtypes = [wintypes.HWND]
+    user32.DestroyWindow.restype = wintypes.BOOL
+    user32.PostMessageW.argtypes = [wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+    user32.PostMessageW.restype = wintypes.BOOL
+    user32.PostQuitMessage.argtypes = [ctypes.c_int]
+    user32.PostQuitMessage.restype = None
+    user32.GetMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT, wintypes.UINT]
+    user32.GetMessageW.restype = wintypes.BOOL
+    user32.TranslateMessage.argtypes = [ctypes.POINTER(wintypes.MSG)]
+    user32.TranslateMessage.restype = wintypes.BOOL
+    user32.DispatchMessageW.argtypes = [ctypes.POINTER(wintypes.MSG)]
+    user32.DispatchMessageW.restype = LRESULT
+    user32.AddClipboardFormatListener.argtypes = [wintypes.HWND]
+    user32.AddClipboardFormatListener.restype = wintypes.BOOL
+    user32.RemoveClipboardFormatListener.argtypes = [wintypes.HWND]
+    user32.RemoveClipboardFormatListener.restype = wintypes.BOOL
+    kernel32.GetCurrentThreadId.argtypes = []
+    kernel32.GetCurrentThreadId.restype = wintypes.DWORD
+    user32.PeekMessageW.argtypes = [ctypes.POINTER(wintypes.MSG), wintypes.HWND, wintypes.UINT,
+                                    wintypes.UINT, wintypes.UINT]
+    user32.PeekMessageW.restype = wintypes.BOOL
+    user32.PostThreadMessageW.argtypes = [wintypes.DWORD, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM]
+    user32.PostThreadMessageW.restype = wintypes.BOOL
+    user32.RegisterHotKey.argtypes = [wintypes.HWND, ctypes.c_int, wintypes.UINT, wintypes.UINT]
+    user32.RegisterHotKey.restype = wintypes.BOOL
+    user32.UnregisterHotKey.argtypes = [wintypes.HWND, ctypes.c_int]
+    user32.UnregisterHotKey.restype = wintypes.BOOL
+    user32.GetForegroundWindow.argtypes = []
+    user32.GetForegroundWindow.restype = wintypes.HWND
+    user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+    user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+    kernel32.GetCurrentProcessId.argtypes = []
+    kernel32.GetCurrentProcessId.restype = wintypes.DWORD
+    user32.MapVirtualKeyW.argtypes = [wintypes.UINT, wintypes.UINT]
+    user32.MapVirtualKeyW.restype = wintypes.UINT
+    user32.SendInput.argtypes = [wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int]
+    user32.SendInput.restype = wintypes.UINT
+    user32.OpenClipboard.argtypes = [wintypes.HWND]
+    user32.OpenClipboard.restype = wintypes.BOOL
+    user32.EmptyClipboard.argtypes = []
+    user32.EmptyClipboard.restype = wintypes.BOOL
+    user32.SetClipboardData.argtypes = [wintypes.UINT, wintypes.HANDLE]
+    user32.SetClipboardData.restype = wintypes.HANDLE
+    user32.CloseClipboard.argtypes = []
+    user32.CloseClipboard.restype = wintypes.BOOL
+    kernel32.GlobalAlloc.argtypes = [wintypes.UINT, ctypes.c_size_t]
+    kernel32.GlobalAlloc.restype = wintypes.HGLOBAL
+    kernel32.GlobalLock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalLock.restype = wintypes.LPVOID
+    kernel32.GlobalUnlock.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalUnlock.restype = wintypes.BOOL
+    kernel32.GlobalFree.argtypes = [wintypes.HGLOBAL]
+    kernel32.GlobalFree.restype = wintypes.HGLOBAL
+
+
+_LISTENER_CLASS_NAME = "PasteyClipboardListener"
+_listeners = {}
+_wndproc = None
+# Message-only window that owns the clipboard data set by set_clipboard_text
+_clipboard_owner = None
+
+
+def _listener_wndproc(hwnd, msg, wparam, lparam):
+    """Window procedure shared by all clipboard listener windows."""
+    if msg == WM_CLIPBOARDUPDATE:
+        listener = _listeners.get(hwnd)
+        if listener:
+            try:
+                listener.on_update()
+            except Exception as e:
+                print(f"Error handling clipboard update: {e}")
+        return 0
+
+    if msg == WM_DESTROY:
+        user32.PostQuitMessage(0)
+        return 0
+
+    return user32.DefWindowProcW(hwnd, msg, wparam, lparam)
+
+
+def _register_listener_class():
+    """Register the listener window class once per process."""
+    global _wndproc
+    if _wndproc is not None:
+        return
+
+    # Keep a reference to the callback so it is never garbage collected
+    _wndproc = WNDPROC(_listener_wndproc)
+
+    window_class = WNDCLASSW()
+    window_class.lpfnWndProc = _wndproc
+    window_class.hInstance = kernel32.GetModuleHandleW(None)
+    window_class.lpszClassName = _LISTENER_CLASS_NAME
+
+    if not user32.RegisterClassW(ctypes.byref(window_class)):
+        error = ctypes.get_last_error()
+        if error != ERROR_CLASS_ALREADY_EXISTS:
+            raise ctypes.WinError(error)
+
+
+class ClipboardListener:
+    def __init__(self, on_update: Callable[[], None]):
+        """
+        Initialize a clipboard change listener.
+
+        Args:
+            on_update: Function to call whenever the clipboard contents change
+        """
+        self.on_update = on_update
+        self.hwnd = None
+        self._stopped = threading.Event()
+
+    def run(self):
+        """
+        Create a hidden message-only window and pump its messages until stopped.
+
+        Blocks the calling thread; WM_CLIPBOARDUPDATE notifications are delivered
+        on that same thread, so no CPU is used while the clipboard is idle.
+        """
+        _register_listener_class()
+
+        hwnd = user32.CreateWindowExW(0, _LISTENER_CLASS_NAME, None, 0, 0, 0, 0, 0,
+                                      HWND_MESSAGE, None, kernel32.GetModuleHandleW(None), None)
+        if not hwnd:
+            raise ctypes.WinError(ctypes.get_last_error())
+
+        self.hwnd = hwnd
+        _listeners[hwnd] = self
+        try:
+            if not user32.AddClipboardFormatListener(hwnd):
+                raise ctypes.WinError(ctypes.get_last_error())
+
+            # stop() may have been called before the window existed
+            if self._stopped.is_set():
+                return
+
+            msg = wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+        finally:
+            user32.RemoveClipboardFormatListener(hwnd)
+            user32.DestroyWindow(hwnd)
+            _listeners.pop(hwnd, None)
+            self.hwnd = None
+
+    def stop(self):
+        """Ask the message loop to exit. Safe to call from any thread."""
+        self._stopped.set()
+        hwnd = self.hwnd
+        if hwnd:
+            user32.PostMessageW(hwnd, WM_CLOSE, 0, 0)
+
+
+class HotkeyListener:
+    def __init__(self):
+        """Initialize a listener for system-wide hotkeys registered with Windows."""
+        self._hotkeys = {}
+        self._thread_id = None
+        self._stopped = threading.Event()
+        # Set once run() has tried to register every hotkey
+        self.registered = threading.Event()
+        # (modifiers, key, error message) of each hotkey Windows refused
+        self.failures: List[Tuple[int, int, str]] = []
+
+    def add_hotkey(self, modifiers: int, key: int, callback: Callable[[], None]):
+        """
+        Add a hotkey to register when the listener runs.
+
+        Args:
+            modifiers: Combination of MOD_ALT, MOD_CONTROL and MOD_SHIFT
+            key: Virtual-key code, e.g. ord('Z')
+            callback: Function to call on the listener thread when the hotkey is pressed
+        """
+        self._hotkeys[len(self._hotkeys) + 1] = (modifiers, key, callback)
+
+    def run(self):
+        """
+        Register the hotkeys and wait for them until stopped.
+
+        Blocks the calling thread. Windows posts WM_HOTKEY to this thread only
+        when a registered combination is pressed, so no other keystroke is seen.
+        """
+        msg = wintypes.MSG()
+        # Make sure the thread has a message queue before anyone can post to it
+        user32.PeekMessageW(ctypes.byref(msg), None, WM_USER, WM_USER, PM_NOREMOVE)
+        self._thread_id = kernel32.GetCurrentThreadId()
+
+        registered = []
+        try:
+            try:
+                for hotkey_id, (modifiers, key, _) in self._hotkeys.items():
+                    if user32.RegisterHotKey(None, hotkey_id, modifiers | MOD_NOREPEAT, key):
+                        registered.append(hotkey_id)
+                    else:
+                        error = ctypes.WinError(ctypes.get_last_error())
+                        self.failures.append((modifiers, key, error.strerror or str(error)))
+            finally:
+                # Let whoever started the thread report the outcome
+                self.registered.set()
+
+            # stop() may have been called before the queue existed
+            if self._stopped.is_set():
+                return
+
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                if msg.message == WM_HOTKEY:
+                    hotkey = self._hotkeys.get(msg.wParam)
+                    if hotkey:
+                        try:
+                            hotkey[2]()
+                        except Exception as e:
+                            print(f"Error handling hotkey: {e}")
+        finally:
+            for hotkey_id in registered:
+                user32.UnregisterHotKey(None, hotkey_id)
+            self._thread_id = None
+
+    def stop(self):
+        """Ask the listener to unregister its hotkeys and exit. Safe to call from any thread."""
+        self._stopped.set()
+        thread_id = self._thread_id
+        if thread_id:
+            user32.PostThreadMessageW(thread_id, WM_QUIT, 0, 0)
+
+
+def wait_for_foreground_release(timeout: float = 0.2) -> bool:
+    """
+    Wait until a window of another process has the foreground, e.g. after hiding our own.
+
+    Args:
+        timeout: Maximum number of seconds to wait
+
+    Returns:
+        True if another process's window got the foreground within the timeout
+    """
+    own_pid = kernel32.GetCurrentProcessId()
+    owner = wintypes.DWORD()
+    deadline = time.monotonic() + timeout
+    while True:
+        hwnd = user32.GetForegroundWindow()
+        if hwnd:
+            user32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+            if owner.value != own_pid:
+                return True
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.001)
+
+
+def send_paste() -> bool:
+    """
+    Press and release Ctrl+V in the foreground window with a single SendInput call.
+
+    Returns:
+        True if all key events were injected
+    """
+    events = (
+        (VK_CONTROL, 0),
+        (VK_V, 0),
+        (VK_V, KEYEVENTF_KEYUP),
+        (VK_CONTROL, KEYEVENTF_KEYUP),
+    )
+    inputs = (INPUT * len(events))()
+    for event, (vk, flags) in zip(inputs, events):
+        event.type = INPUT_KEYBOARD
+        event.ki.wVk = vk
+        # Virtual keys keep the shortcut layout-independent; the scan code is
+        # filled in for applications that look at it
+        event.ki.wScan = user32.MapVirtualKeyW(vk, MAPVK_VK_TO_VSC)
+        event.ki.dwFlags = flags
+
+    return user32.SendInput(len(events), inputs, ctypes.sizeof(INPUT)) == len(events)
+
+
+def _open_clipboard(timeout: float) -> bool:
+    """
+    Open the clipboard, retrying with exponential backoff while another process holds it.
+
+    Args:
+        timeout: Maximum number of seconds to keep retrying
+
+    Returns:
+        True if the clipboard is now open and must be closed with CloseClipboard
+    """
+    global _clipboard_owner
+    if not _clipboard_owner:
+        # EmptyClipboard with no owner window makes SetClipboardData unreliable
+        _clipboard_owner = user32.CreateWindowExW(0, "STATIC", None, 0, 0, 0, 0, 0,
+                                                  HWND_MESSAGE, None, None, None)
+
+    deadline = time.monotonic() + timeout
+    delay = 0.001
+    while not user32.OpenClipboard(_clipboard_owner):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(delay)
+        delay = min(delay * 2, 0.05)
+    return True
+
+
+def set_clipboard_text(text: str, timeout: float = 0.5) -> bool:
+    """
+    Put text on the clipboard as CF_UNICODETEXT.
+
+    Args:
+        text: Text to copy
+        timeout: Maximum number of seconds to wait for the clipboard to become available
+
+    Returns:
+        True if the clipboard now holds the text
+    """
+    data = text.encode("utf-16-le", "surrogatepass") + b"\0\0"
+    handle = kernel32.GlobalAlloc(GMEM_MOVEABLE, len(data))
+    if not handle:
+        return False
+    pointer = kernel32.GlobalLock(handle)
+    if not pointer:
+        kernel32.GlobalFree(handle)
+        return False
+    ctypes.memmove(pointer, data, len(data))
+    kernel32.GlobalUnlock(handle)
+
+    if not _open_clipboard(timeout):
+        kernel32.GlobalFree(handle)
+        return False
+    try:
+        user32.EmptyClipboard()
+        if not user32.SetClipboardData(CF_UNICODETEXT, handle):
+            kernel32.GlobalFree(handle)
+            return False
+        # The system owns the memory from here on
+        return True
+    finally:
+        user32.CloseClipboard()